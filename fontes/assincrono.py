@@ -0,0 +1,200 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+from fontes.detectores import DetectorDPI
+
+# Detector de cada processo quando a fachada usa um ProcessPoolExecutor (criado no primeiro uso)
+_detector_processo = None
+
+
+def _analisar_lote_processo(opcoes_detector: Dict[str, Any], textos: List[str], estrito: bool) -> List[Dict[str, Any]]:
+    global _detector_processo
+    if _detector_processo is None:
+        _detector_processo = DetectorDPI(**opcoes_detector)
+    return _detector_processo.analisar_lote(textos, estrito=estrito)
+
+
+_FIM = object()
+
+
+class DetectorDPIAssincrono:
+    """
+    Fachada asyncio do DetectorDPI: a análise roda em um executor, sem bloquear o event loop.
+
+    No máximo `max_em_andamento` lotes ficam em execução ao mesmo tempo; chamadas além disso
+    aguardam (backpressure). Por padrão usa um ThreadPoolExecutor próprio de uma thread; com um
+    ProcessPoolExecutor cada processo carrega o próprio detector com `opcoes_detector`.
+
+    Exemplo:
+        async with DetectorDPIAssincrono(pre_filtro_ner=True) as detector:
+            resultado = await detector.analisar("Meu CPF é 123.456.789-09")
+            async for indice, resultado in detector.analisar_fluxo(mensagens()):
+                ...
+    """
+
+    def __init__(self, detector: Optional[DetectorDPI] = None, executor: Optional[Executor] = None,
+                 max_em_andamento: int = 4, tamanho_lote: int = 64, espera_max_s: float = 0.05,
+                 **opcoes_detector):
+        self._executor_proprio = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix='dpi-assincrono')
+        self._em_processos = isinstance(self._executor, ProcessPoolExecutor)
+        self._opcoes_detector = opcoes_detector
+        if self._em_processos:
+            self.detector = detector
+        else:
+            self.detector = detector or DetectorDPI(**opcoes_detector)
+        self.max_em_andamento = max_em_andamento
+        self.tamanho_lote = tamanho_lote
+        self.espera_max_s = espera_max_s
+        # O Spacy e os contadores do detector não são thread-safe: uma análise por vez em threads
+        self._trava = threading.Lock()
+        self._semaforo: Optional[asyncio.Semaphore] = None
+
+    def _obter_semaforo(self) -> asyncio.Semaphore:
+        # Criado dentro do event loop (no Python 3.9 o semáforo fica preso ao loop da criação)
+        if self._semaforo is None:
+            self._semaforo = asyncio.Semaphore(self.max_em_andamento)
+        return self._semaforo
+
+    def _analisar_lote_sincrono(self, textos: List[str], estrito: bool) -> List[Dict[str, Any]]:
+        with self._trava:
+            return self.detector.analisar_lote(textos, estrito=estrito)
+
+    def _executar(self, textos: List[str], estrito: bool) -> "asyncio.Future":
+        if self._em_processos:
+            funcao = partial(_analisar_lote_processo, self._opcoes_detector, textos, estrito)
+        else:
+            funcao = partial(self._analisar_lote_sincrono, textos, estrito)
+        return asyncio.get_running_loop().run_in_executor(self._executor, funcao)
+
+    async def analisar_lote(self, textos: Iterable[str], estrito: bool = True) -> List[Dict[str, Any]]:
+        """Equivalente assíncrono de `DetectorDPI.analisar_lote` (resultados na ordem de entrada)."""
+        textos = list(textos)
+        async with self._obter_semaforo():
+            return await self._executar(textos, estrito)
+
+    async def analisar(self, texto: str, estrito: bool = True) -> Dict[str, Any]:
+        """Equivalente assíncrono de `DetectorDPI.analisar`."""
+        return (await self.analisar_lote([texto], estrito))[0]
+
+    async def analisar_fluxo(self, textos: Union[AsyncIterable[str], Iterable[str]],
+                             estrito: bool = True) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Analisa um fluxo (contínuo) de textos, devolvendo `(indice, resultado)` à medida que
+        cada lote termina; o índice é a posição do texto no fluxo de entrada.
+
+        LÓGICA COMPLEXA: uma tarefa lê o fluxo para uma fila limitada e outra forma lotes de até
+        `tamanho_lote` textos, fechando um lote incompleto após `espera_max_s` sem novos textos
+        (fluxos lentos não ficam parados esperando o lote encher). Cada lote ocupa uma vaga do
+        semáforo até seus resultados serem consumidos, então um consumidor lento também freia a
+        leitura do fluxo. Interromper a iteração (break, aclose ou cancelamento da tarefa)
+        cancela a leitura e os lotes pendentes.
+        """
+        loop = asyncio.get_running_loop()
+        semaforo = self._obter_semaforo()
+        entrada: asyncio.Queue = asyncio.Queue(maxsize=self.tamanho_lote * self.max_em_andamento)
+        saida: asyncio.Queue = asyncio.Queue(maxsize=self.tamanho_lote * self.max_em_andamento)
+
+        async def ler_fluxo():
+            try:
+                indice = 0
+                if hasattr(textos, '__aiter__'):
+                    async for texto in textos:
+                        await entrada.put((indice, texto))
+                        indice += 1
+                else:
+                    for texto in textos:
+                        await entrada.put((indice, texto))
+                        indice += 1
+                await entrada.put(_FIM)
+            except Exception as e:
+                await entrada.put(e)
+
+        async def executar_lote(lote):
+            try:
+                resultados = await self._executar([texto for _, texto in lote], estrito)
+                for (indice, _), resultado in zip(lote, resultados):
+                    await saida.put((indice, resultado))
+            except Exception as e:
+                await saida.put(e)
+
+        leitura_pendente = None
+
+        async def obter(espera=None):
+            # asyncio.wait em vez de wait_for: o wait_for do Python < 3.12 pode engolir o
+            # cancelamento. Em caso de tempo esgotado a leitura continua pendente para a próxima
+            # chamada, então nenhum texto se perde.
+            nonlocal leitura_pendente
+            if leitura_pendente is None:
+                leitura_pendente = asyncio.ensure_future(entrada.get())
+            concluidas, _ = await asyncio.wait({leitura_pendente}, timeout=espera)
+            if not concluidas:
+                return None
+            item, leitura_pendente = leitura_pendente.result(), None
+            return item
+
+        async def despachar():
+            tarefas = set()
+            try:
+                final = None
+                while final is None:
+                    item = await obter()
+                    if not isinstance(item, tuple):
+                        final = item
+                        break
+                    lote = [item]
+                    limite = loop.time() + self.espera_max_s
+                    while len(lote) < self.tamanho_lote:
+                        restante = limite - loop.time()
+                        if restante <= 0:
+                            break
+                        item = await obter(restante)
+                        if item is None:
+                            break
+                        if not isinstance(item, tuple):
+                            final = item
+                            break
+                        lote.append(item)
+                    await semaforo.acquire()
+                    tarefa = asyncio.ensure_future(executar_lote(lote))
+                    tarefas.add(tarefa)
+                    tarefa.add_done_callback(tarefas.discard)
+                    # No callback (e não em um finally): libera a vaga mesmo se cancelada antes de iniciar
+                    tarefa.add_done_callback(lambda _: semaforo.release())
+                if tarefas:
+                    await asyncio.gather(*tarefas)
+                await saida.put(final)
+            finally:
+                if leitura_pendente is not None:
+                    leitura_pendente.cancel()
+                for tarefa in tarefas:
+                    tarefa.cancel()
+
+        leitor = asyncio.ensure_future(ler_fluxo())
+        despachante = asyncio.ensure_future(despachar())
+        try:
+            while True:
+                item = await saida.get()
+                if item is _FIM:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            leitor.cancel()
+            despachante.cancel()
+            await asyncio.gather(leitor, despachante, return_exceptions=True)
+
+    async def fechar(self) -> None:
+        """Encerra o executor criado pela fachada (um executor recebido continua com o chamador)."""
+        if self._executor_proprio:
+            self._executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> "DetectorDPIAssincrono":
+        return self
+
+    async def __aexit__(self, *excecao) -> None:
+        await self.fechar()
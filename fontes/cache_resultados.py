@@ -0,0 +1,122 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+CAMINHO_CACHE_PADRAO = '.cache_dpi.sqlite'
+
+# Limite de variáveis por consulta do SQLite (valor conservador para versões antigas)
+_MAX_PARAMETROS_SQL = 900
+
+
+class CacheResultados:
+    """
+    Cache persistente (SQLite) dos resultados de `DetectorDPI.analisar`.
+
+    A chave é o SHA-256 do texto já limpo (`limpar_texto`) junto com a assinatura do
+    detector (versão, modelo, modo estrito, etc.), de modo que uma mudança de regras ou de
+    configuração nunca reaproveita resultados antigos. Quando o número de entradas passa de
+    `max_entradas`, as menos acessadas recentemente são removidas (LRU).
+    """
+
+    def __init__(self, caminho: str = CAMINHO_CACHE_PADRAO, max_entradas: int = 1_000_000):
+        self.caminho = caminho
+        self.max_entradas = max_entradas
+        self.acertos = 0
+        self.faltas = 0
+        self._trava = threading.Lock()
+        # check_same_thread=False: a interface Streamlit reexecuta o script em outras threads
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.execute('PRAGMA journal_mode=WAL')
+        self._conexao.execute(
+            'CREATE TABLE IF NOT EXISTS resultados '
+            '(chave TEXT PRIMARY KEY, resultado TEXT NOT NULL, acesso REAL NOT NULL)'
+        )
+        self._conexao.execute('CREATE INDEX IF NOT EXISTS idx_resultados_acesso ON resultados (acesso)')
+        self._conexao.commit()
+        self._total_entradas = self._conexao.execute('SELECT COUNT(*) FROM resultados').fetchone()[0]
+
+    @staticmethod
+    def gerar_chave(texto: str, assinatura: str) -> str:
+        return hashlib.sha256(f"{assinatura}\0{texto}".encode('utf-8')).hexdigest()
+
+    def obter_varios(self, chaves: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Busca várias chaves de uma vez, atualizando o instante de acesso das encontradas."""
+        chaves = list(chaves)
+        encontrados = {}
+        with self._trava:
+            for i in range(0, len(chaves), _MAX_PARAMETROS_SQL):
+                parte = chaves[i:i + _MAX_PARAMETROS_SQL]
+                marcadores = ','.join('?' * len(parte))
+                for chave, resultado in self._conexao.execute(
+                        f'SELECT chave, resultado FROM resultados WHERE chave IN ({marcadores})', parte):
+                    encontrados[chave] = json.loads(resultado)
+            if encontrados:
+                agora = time.time()
+                self._conexao.executemany('UPDATE resultados SET acesso = ? WHERE chave = ?',
+                                          [(agora, chave) for chave in encontrados])
+                self._conexao.commit()
+        return encontrados
+
+    def gravar_varios(self, itens: Dict[str, Dict[str, Any]]) -> None:
+        """Grava vários resultados e aplica o limite de tamanho do cache."""
+        if not itens:
+            return
+        agora = time.time()
+        with self._trava:
+            cursor = self._conexao.executemany(
+                'INSERT OR IGNORE INTO resultados (chave, resultado, acesso) VALUES (?, ?, ?)',
+                [(chave, json.dumps(resultado, ensure_ascii=False), agora) for chave, resultado in itens.items()]
+            )
+            self._total_entradas += max(cursor.rowcount, 0)
+            excesso = self._total_entradas - self.max_entradas
+            if excesso > 0:
+                self._conexao.execute(
+                    'DELETE FROM resultados WHERE chave IN '
+                    '(SELECT chave FROM resultados ORDER BY acesso LIMIT ?)', (excesso,)
+                )
+                self._total_entradas -= excesso
+            self._conexao.commit()
+
+    def analisar_lote(self, textos: List[str], assinatura: str,
+                      analisar: Callable[[List[str]], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        LÓGICA COMPLEXA: Resolve pelo cache todos os textos já conhecidos e envia apenas os
+        textos inéditos (sem repetição dentro do lote) para a função `analisar`, que recebe uma
+        lista de textos e devolve os resultados na mesma ordem (ex: `DetectorDPI.analisar_lote`).
+
+        Args:
+            textos (List[str]): Textos já limpos.
+            assinatura (str): Assinatura do detector (`DetectorDPI.assinatura`).
+            analisar (Callable): Função de análise em lote para os textos não encontrados.
+
+        Returns:
+            List[Dict[str, Any]]: Um resultado por texto, na ordem de entrada.
+        """
+        chaves: List[Optional[str]] = [
+            self.gerar_chave(t, assinatura) if isinstance(t, str) and t.strip() else None for t in textos
+        ]
+        encontrados = self.obter_varios({c for c in chaves if c is not None})
+
+        # Primeira ocorrência de cada chave ausente do cache
+        pendentes = {}
+        for indice, chave in enumerate(chaves):
+            if chave is not None and chave not in encontrados and chave not in pendentes:
+                pendentes[chave] = indice
+
+        novos = analisar([textos[i] for i in pendentes.values()]) if pendentes else []
+        novos_por_chave = dict(zip(pendentes, novos))
+        self.gravar_varios(novos_por_chave)
+
+        # Repetições dentro do lote também contam como acerto: não passam pelo detector
+        self.acertos += sum(1 for c in chaves if c is not None) - len(pendentes)
+        self.faltas += len(pendentes)
+        encontrados.update(novos_por_chave)
+
+        return [encontrados[c] if c is not None else {'contem_dpi': False, 'evidencias': {}} for c in chaves]
+
+    def fechar(self) -> None:
+        with self._trava:
+            self._conexao.close()
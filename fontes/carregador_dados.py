@@ -1,7 +1,26 @@
 import pandas as pd
-from typing import Optional
+from typing import IO, Dict, Iterator, List, Optional, Tuple, Union
+import codecs
+import csv
 import os
 
+SEPARADORES_CANDIDATOS = ';,\t|'
+
+# Formatos colunares escolhidos pela extensão do arquivo; qualquer outra extensão é lida como CSV
+EXTENSOES_COLUNARES = {'.parquet': 'parquet', '.pq': 'parquet', '.arrow': 'arrow', '.feather': 'arrow', '.ipc': 'arrow'}
+
+def formato_arquivo(caminho_arquivo: str) -> str:
+    """Retorna 'parquet', 'arrow' (Arrow IPC/Feather) ou 'csv' conforme a extensão do arquivo."""
+    return EXTENSOES_COLUNARES.get(os.path.splitext(caminho_arquivo)[1].lower(), 'csv')
+
+def _importar_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+        return pyarrow
+    except ImportError:
+        raise ImportError("Leitura e gravação de Parquet/Arrow exigem o pacote 'pyarrow' (pip install pyarrow).")
+
 def carregar_dados(caminho_arquivo: str) -> Optional[pd.DataFrame]:
     """
     Carrega o arquivo CSV com tratamento de erros para quebras de linha internas.
@@ -15,47 +34,304 @@ def carregar_dados(caminho_arquivo: str) -> Optional[pd.DataFrame]:
     if not os.path.exists(caminho_arquivo):
         print(f"Erro: Arquivo não encontrado em {caminho_arquivo}")
         return None
+    
+    formato_colunar = formato_arquivo(caminho_arquivo)
+    if formato_colunar != 'csv':
+        try:
+            _importar_pyarrow()
+            df = pd.read_parquet(caminho_arquivo) if formato_colunar == 'parquet' else pd.read_feather(caminho_arquivo)
+        except Exception as e:
+            print(f"Erro ao carregar arquivo {formato_colunar}: {e}")
+            return None
+        print(f"Arquivo carregado com sucesso: formato {formato_colunar}")
+        return df
+    
+    try:
+        codificacao, separador = detectar_formato(caminho_arquivo)
+        df, formato = ler_csv(caminho_arquivo, codificacao, separador)
+    except Exception as e:
+        print(f"Erro ao carregar CSV: {e}")
+        return None
+    
+    print(f"Arquivo carregado com sucesso: codificação {formato['codificacao']}, "
+          f"separador {formato['separador']!r}, motor {formato['motor']}")
+    return df
+
+def _motores_csv() -> List[str]:
+    """Parsers rápidos do pandas disponíveis, do mais para o menos rápido."""
+    try:
+        import pyarrow  # noqa: F401
+        return ['pyarrow', 'c']
+    except ImportError:
+        return ['c']
+
+def ler_csv(fonte: Union[str, IO[bytes]], codificacao: str, separador: str) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """
+    Lê um CSV cujo formato já foi detectado (ver `detectar_formato`).
+    
+    Args:
+        fonte (Union[str, IO[bytes]]): Caminho do arquivo ou buffer binário (ex: upload da GUI).
+        codificacao (str): Codificação detectada.
+        separador (str): Separador detectado.
         
-    codificacoes = ['utf-8', 'iso-8859-1', 'latin1', 'cp1252']
+    Returns:
+        Tuple[pd.DataFrame, Dict[str, str]]: DataFrame e o formato efetivamente usado
+        ('codificacao', 'separador' e 'motor').
+    """
+    def ler(**opcoes):
+        if hasattr(fonte, 'seek'):
+            fonte.seek(0)
+        return pd.read_csv(fonte, **opcoes)
     
-    for codificacao in codificacoes:
+    # LÓGICA COMPLEXA: com codificação e separador conhecidos, o arquivo é lido uma única vez
+    # pelo parser mais rápido disponível (pyarrow, depois C). Um byte inválido depois da
+    # amostra faz uma nova leitura em ISO-8859-1, que aceita qualquer byte: o motor C levanta
+    # UnicodeDecodeError, já o pyarrow não falha e devolve a coluna como `bytes`, por isso o
+    # resultado é conferido. Os motores rápidos não descartam linhas (on_bad_lines='error'):
+    # um arquivo malformado (aspas sem fechamento, separador errado, etc.) cai no parser Python,
+    # lento, mas que redetecta o separador (sep=None), como a antiga lista de tentativas.
+    for motor in _motores_csv():
+        opcoes = {'sep': separador, 'encoding': codificacao, 'engine': motor}
+        if motor != 'pyarrow':
+            opcoes['on_bad_lines'] = 'error'
+        try:
+            try:
+                df = ler(**opcoes)
+                if _tem_colunas_binarias(df):
+                    raise UnicodeDecodeError(codificacao, b'', 0, 1, 'bytes inválidos após a amostra')
+                return df, {'codificacao': codificacao, 'separador': separador, 'motor': motor}
+            except UnicodeDecodeError:
+                if codificacao == 'iso-8859-1':
+                    raise
+                opcoes['encoding'] = 'iso-8859-1'
+                return ler(**opcoes), {'codificacao': 'iso-8859-1', 'separador': separador, 'motor': motor}
+        except Exception as e:
+            print(f"Aviso: leitura com o motor {motor} falhou ({e}).")
+    
+    opcoes = {'sep': None, 'engine': 'python', 'on_bad_lines': 'warn'}
+    try:
+        df = ler(encoding=codificacao, **opcoes)
+    except UnicodeDecodeError:
+        codificacao = 'iso-8859-1'
+        df = ler(encoding=codificacao, **opcoes)
+    return df, {'codificacao': codificacao, 'separador': 'auto', 'motor': 'python'}
+
+def _tem_colunas_binarias(df: pd.DataFrame) -> bool:
+    """Indica se alguma coluna de texto veio como `bytes` (texto que não pôde ser decodificado)."""
+    for coluna in df.columns[df.dtypes == object]:
+        indice = df[coluna].first_valid_index()
+        if indice is not None and isinstance(df[coluna].at[indice], bytes):
+            return True
+    return False
+
+def detectar_formato(caminho_arquivo: str, tamanho_amostra: int = 64 * 1024) -> Tuple[str, str]:
+    """
+    Detecta codificação e separador a partir de uma pequena amostra do início do arquivo.
+    
+    Args:
+        caminho_arquivo (str): Caminho do arquivo CSV.
+        tamanho_amostra (int): Quantidade de bytes lidos para a detecção.
+        
+    Returns:
+        Tuple[str, str]: (codificação, separador).
+    """
+    with open(caminho_arquivo, 'rb') as arquivo:
+        return detectar_formato_amostra(arquivo.read(tamanho_amostra))
+
+def detectar_formato_amostra(amostra: bytes) -> Tuple[str, str]:
+    """
+    Detecta codificação e separador a partir dos bytes iniciais de um CSV.
+    
+    Args:
+        amostra (bytes): Início do arquivo.
+        
+    Returns:
+        Tuple[str, str]: (codificação, separador).
+    """
+    # LÓGICA COMPLEXA: o decodificador incremental (final=False) tolera um caractere
+    # multibyte cortado no fim da amostra. Se a amostra não for UTF-8 válido, usamos
+    # ISO-8859-1, que aceita qualquer byte (mesmo comportamento da antiga lista de tentativas).
+    if amostra.startswith(codecs.BOM_UTF8):
+        codificacao = 'utf-8-sig'
+    else:
         try:
-            # LÓGICA COMPLEXA: sep=None com engine='python' detecta o separador 
-            # automaticamente (vírgula, ponto e vírgula, etc). Isso é crucial para
-            # datasets brasileiros que variam o padrão de exportação.
-            # on_bad_lines='warn' evita que o script pare caso haja linhas mal formatadas.
-            df = pd.read_csv(
-                caminho_arquivo, 
-                sep=None, 
-                encoding=codificacao, 
-                engine='python',
-                on_bad_lines='warn'
-            )
-            print(f"Arquivo carregado com sucesso usando codificação: {codificacao}")
-            return df
+            codecs.getincrementaldecoder('utf-8')().decode(amostra, final=False)
+            codificacao = 'utf-8'
         except UnicodeDecodeError:
-            continue
+            codificacao = 'iso-8859-1'
+    
+    # LÓGICA COMPLEXA: o separador vem do cabeçalho, e não da amostra inteira: em textos
+    # livres entre aspas (ex: e-SIC separado por ';') as vírgulas são muito mais frequentes
+    # que o separador real, e o csv.Sniffer escolheria ','. Cada candidato é aplicado ao
+    # cabeçalho com o leitor de CSV (respeitando aspas) e vence o que gera mais colunas.
+    texto_amostra = amostra.decode(codificacao, errors='ignore')
+    cabecalho = texto_amostra.splitlines()[0] if texto_amostra else ''
+    colunas = {sep: len(next(csv.reader([cabecalho], delimiter=sep), [])) for sep in SEPARADORES_CANDIDATOS}
+    separador = max(SEPARADORES_CANDIDATOS, key=colunas.get)
+    if colunas[separador] <= 1:
+        # Cabeçalho de uma coluna só: o Sniffer sobre a amostra decide (',' se não conseguir)
+        try:
+            separador = csv.Sniffer().sniff(texto_amostra, delimiters=SEPARADORES_CANDIDATOS).delimiter
+        except csv.Error:
+            separador = ','
+    
+    return codificacao, separador
+
+def _confirmar_codificacao(caminho_arquivo: str, codificacao: str, tamanho_bloco: int = 2 ** 20) -> str:
+    """
+    Confere se o arquivo inteiro (e não só a amostra) é válido na codificação detectada.
+    
+    LÓGICA COMPLEXA: na leitura em blocos, um byte inválido no meio do arquivo só aparece
+    depois que os blocos anteriores já foram gravados, e não dá mais para recomeçar em outra
+    codificação. Por isso o arquivo é decodificado antes, de forma incremental (memória
+    constante), e a codificação final é a mesma que `ler_csv` usaria ao ler o arquivo inteiro:
+    a detectada se ela for válida até o fim, senão ISO-8859-1.
+    
+    Args:
+        caminho_arquivo (str): Caminho do arquivo CSV.
+        codificacao (str): Codificação detectada na amostra.
+        tamanho_bloco (int): Quantidade de bytes decodificados por vez.
+        
+    Returns:
+        str: Codificação a usar na leitura.
+    """
+    if codificacao == 'iso-8859-1':
+        return codificacao
+    decodificador = codecs.getincrementaldecoder(codificacao)()
+    try:
+        with open(caminho_arquivo, 'rb') as arquivo:
+            for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+                decodificador.decode(bloco)
+        decodificador.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return 'iso-8859-1'
+    return codificacao
+
+def carregar_dados_em_blocos(caminho_arquivo: str, tamanho_bloco: int = 10000) -> Optional[Iterator[pd.DataFrame]]:
+    """
+    Lê o arquivo (CSV, Parquet ou Arrow IPC) em blocos, mantendo em memória apenas um bloco por vez.
+    
+    Args:
+        caminho_arquivo (str): Caminho do arquivo.
+        tamanho_bloco (int): Quantidade de linhas por bloco.
+        
+    Returns:
+        Optional[Iterator[pd.DataFrame]]: Iterador de DataFrames ou None em caso de erro.
+    """
+    if not os.path.exists(caminho_arquivo):
+        print(f"Erro: Arquivo não encontrado em {caminho_arquivo}")
+        return None
+    
+    formato_colunar = formato_arquivo(caminho_arquivo)
+    if formato_colunar != 'csv':
+        try:
+            pa = _importar_pyarrow()
+            if formato_colunar == 'parquet':
+                lotes = pa.parquet.ParquetFile(caminho_arquivo).iter_batches(batch_size=tamanho_bloco)
+            else:
+                # Mapeado em memória: read_all não copia os dados, só os blocos convertidos ocupam RAM
+                tabela = pa.ipc.open_file(pa.memory_map(caminho_arquivo)).read_all()
+                lotes = tabela.to_batches(max_chunksize=tamanho_bloco)
         except Exception as e:
-            print(f"Erro ao carregar CSV com codificação {codificacao}: {e}")
-            continue
-            
-    print("Erro: Não foi possível ler o arquivo com nenhuma das codificações testadas.")
-    return None
+            print(f"Erro ao abrir arquivo {formato_colunar} para leitura em blocos: {e}")
+            return None
+        print(f"Formato detectado: {formato_colunar}")
+        return (lote.to_pandas() for lote in lotes)
+    
+    try:
+        codificacao, separador = detectar_formato(caminho_arquivo)
+        codificacao = _confirmar_codificacao(caminho_arquivo, codificacao)
+        print(f"Formato detectado: codificação {codificacao}, separador {separador!r}")
+        # Com o separador já conhecido, o parser em C lê o arquivo de forma incremental.
+        return pd.read_csv(
+            caminho_arquivo,
+            sep=separador,
+            encoding=codificacao,
+            on_bad_lines='warn',
+            chunksize=tamanho_bloco
+        )
+    except Exception as e:
+        print(f"Erro ao abrir CSV para leitura em blocos: {e}")
+        return None
 
-def salvar_dados(df: pd.DataFrame, caminho_saida: str) -> bool:
+def salvar_dados(df: pd.DataFrame, caminho_saida: str, anexar: bool = False) -> bool:
     """
-    Salva o DataFrame em um arquivo CSV.
+    Salva o DataFrame em um arquivo CSV (para Parquet/Arrow, ver `GravadorColunar`).
     
     Args:
         df (pd.DataFrame): DataFrame a ser salvo.
         caminho_saida (str): Caminho do arquivo de saída.
+        anexar (bool): Se True, acrescenta as linhas ao final do arquivo (sem cabeçalho).
         
     Returns:
         bool: True se salvo com sucesso, False caso contrário.
     """
     try:
-        df.to_csv(caminho_saida, index=False, encoding='utf-8')
+        df.to_csv(caminho_saida, index=False, encoding='utf-8',
+                  mode='a' if anexar else 'w', header=not anexar)
         return True
     except Exception as e:
         print(f"Erro ao salvar CSV: {e}")
         return False
+
+class GravadorColunar:
+    """
+    Grava DataFrames em um arquivo Parquet ou Arrow IPC (conforme a extensão), bloco a bloco.
+    
+    LÓGICA COMPLEXA: o esquema é fixado no primeiro bloco e os blocos seguintes são convertidos
+    para ele. Colunas sem nenhum valor no primeiro bloco (tipo `null`, inclusive listas vazias)
+    são gravadas como texto, para que um bloco posterior com valores não mude o esquema. Como o
+    pandas lê em float64 uma coluna vazia de um bloco do CSV, colunas só com ausentes são
+    convertidas para `None` antes de cada gravação: no primeiro bloco viram `null` (logo texto)
+    e nos seguintes viram nulos de qualquer tipo.
+    """
+    
+    def __init__(self, caminho_saida: str):
+        self.caminho_saida = caminho_saida
+        self.formato = formato_arquivo(caminho_saida)
+        self._pa = _importar_pyarrow()
+        self._esquema = None
+        self._escritor = None
+    
+    def _esquema_estavel(self, esquema):
+        pa = self._pa
+        campos = []
+        for campo in esquema:
+            tipo = campo.type
+            if pa.types.is_null(tipo):
+                tipo = pa.string()
+            elif pa.types.is_list(tipo) and pa.types.is_null(tipo.value_type):
+                tipo = pa.list_(pa.string())
+            campos.append(pa.field(campo.name, tipo))
+        return pa.schema(campos)
+    
+    def gravar(self, df: pd.DataFrame) -> bool:
+        """
+        Acrescenta o DataFrame ao arquivo.
+        
+        Returns:
+            bool: True se gravado com sucesso, False caso contrário.
+        """
+        try:
+            vazias = [coluna for coluna in df.columns
+                      if df[coluna].dtype.kind in 'fO' and df[coluna].isna().all()]
+            if vazias:
+                df = df.assign(**{coluna: pd.Series([None] * len(df), index=df.index, dtype=object)
+                                  for coluna in vazias})
+            if self._escritor is None:
+                self._esquema = self._esquema_estavel(self._pa.Schema.from_pandas(df, preserve_index=False))
+                if self.formato == 'parquet':
+                    self._escritor = self._pa.parquet.ParquetWriter(self.caminho_saida, self._esquema)
+                else:
+                    self._escritor = self._pa.ipc.new_file(self.caminho_saida, self._esquema)
+            tabela = self._pa.Table.from_pandas(df, schema=self._esquema, preserve_index=False)
+            self._escritor.write_table(tabela)
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar {self.formato}: {e}")
+            return False
+    
+    def fechar(self) -> None:
+        if self._escritor is not None:
+            self._escritor.close()
+            self._escritor = None
@@ -1,34 +1,147 @@
+import os
 import re
-from typing import List, Dict, Any, Optional
+import threading
+from time import perf_counter
+from typing import List, Dict, Any, Optional, Iterable, Tuple, Callable
+
+from fontes.dicionario_exclusao import DicionarioExclusao, ARQUIVO_EXCLUSAO_PADRAO
+from fontes.estatisticas import EstatisticasDeteccao
+
+# Incrementar sempre que uma mudança de regras alterar os resultados (invalida o cache persistente)
+VERSAO_DETECTOR = "1.4.1"
+
+# Posições (início, fim) de cada ocorrência encontrada, por tipo de evidência
+Posicoes = Dict[str, List[List[int]]]
+
+# Evidências que, sozinhas, elevam o nível de risco para "Alto"
+TIPOS_ALTO_RISCO = ('CPF', 'CNPJ', 'Email', 'RG', 'Financeiro')
+
+_padrao_nao_digito = re.compile(r'\D')
+# Unidades da federação (órgão emissor do RG, ex: "SSP/SP")
+_UFS = 'AC|AL|AP|AM|BA|CE|DF|ES|GO|MA|MT|MS|MG|PA|PB|PR|PE|PI|RJ|RN|RS|RO|RR|SC|SP|SE|TO'
+# RG com dígito verificador explícito após o hífen (8 dígitos + DV) e a UF emissora ao final
+_padrao_rg_com_dv = re.compile(r'(\d{2})\.?(\d{3})\.?(\d{3})-([\dXx])\b')
+_padrao_rg_uf = re.compile(rf'\b({_UFS})$')
+# Dado financeiro: tipo (pela palavra-chave) e número
+_padrao_financeiro = re.compile(r'(?i)^(ag|conta|cart|pix)\D*(\d.*)$')
+_padrao_ano = re.compile(r'(?:19|20)\d{2}')
+
+# Componentes do pacote pt_core_news_* que o detector não usa (só as entidades PER do ner)
+_COMPONENTES_DISPENSAVEIS = ['morphologizer', 'parser', 'lemmatizer', 'trainable_lemmatizer',
+                             'attribute_ruler', 'tagger', 'senter']
+
+# Modelos Spacy já carregados no processo, por (tamanho, somente_ner); None = indisponível
+_modelos_spacy: Dict[Tuple[str, bool], Any] = {}
+_trava_modelos = threading.Lock()
+_NAO_CARREGADO = object()
+
+def carregar_modelo_spacy(tamanho_modelo: str = "sm", somente_ner: bool = False):
+    """
+    Carrega (uma única vez por processo) o modelo `pt_core_news_<tamanho>` do Spacy.
+
+    Todas as instâncias de DetectorDPI com o mesmo tamanho compartilham o objeto retornado.
+
+    Args:
+        tamanho_modelo (str): Tamanho do modelo (sm, md, lg).
+        somente_ner (bool): Se True, os componentes não usados nem são carregados (`exclude`),
+            o que reduz o tempo de carga e a memória; se False, são carregados e desativados.
+
+    Returns:
+        Optional[spacy.Language]: Modelo carregado ou None se o Spacy/modelo não estiver disponível.
+    """
+    chave = (tamanho_modelo, somente_ner)
+    with _trava_modelos:
+        if chave not in _modelos_spacy:
+            try:
+                import spacy
+                nome = f"pt_core_news_{tamanho_modelo}"
+                if somente_ner:
+                    nlp = spacy.load(nome, exclude=_COMPONENTES_DISPENSAVEIS)
+                else:
+                    nlp = spacy.load(nome)
+                # Só as entidades PER são usadas: desativa parser, lemmatizer, morphologizer etc.
+                # O tok2vec é mantido porque, conforme o pacote, o ner escuta a camada compartilhada.
+                nlp.select_pipes(disable=[p for p in nlp.pipe_names if p not in ('tok2vec', 'ner')])
+            except Exception:
+                nlp = None
+            _modelos_spacy[chave] = nlp
+        return _modelos_spacy[chave]
+
+
+class CamadaDeteccao:
+    """
+    Camada do registro de detecção: o tipo de evidência que produz e o custo relativo declarado.
+    As camadas rodam da mais barata para a mais cara e podem ser ligadas/desligadas por detector.
+
+    Camadas com `padrao` entram na varredura única do texto (ver `DetectorDPI._compilar_varredura`):
+    o padrão não pode ter grupos de captura nem flags globais (use `(?i:...)`) e deve começar em
+    fronteira de palavra; `gatilho` é o prefixo barato que aceita as posições onde ele pode começar
+    e `iniciais` (opcional) as letras com que ele pode começar. `validador` confirma cada trecho
+    encontrado (ex: dígitos verificadores). Na camada 'Nomes' o padrão é a heurística de
+    capitalização, usada só quando o modelo Spacy (NER) não está disponível.
+    """
+
+    def __init__(self, tipo: str, custo: int, padrao: Optional[str] = None, gatilho: Optional[str] = None,
+                 iniciais: str = '', validador: Optional[Callable[[str], bool]] = None):
+        self.tipo = tipo
+        self.custo = custo
+        self.padrao = re.compile(padrao) if padrao is not None else None
+        self.gatilho = gatilho
+        self.iniciais = iniciais
+        self.validador = validador
+
+    def __repr__(self) -> str:
+        return f"CamadaDeteccao({self.tipo!r}, custo={self.custo})"
+
+
+# Registro das camadas, na ordem em que os tipos aparecem nos resultados (ver final do módulo)
+CAMADAS_DETECCAO: Dict[str, CamadaDeteccao] = {}
+
+def registrar_camada(camada: CamadaDeteccao) -> None:
+    """Registra (ou substitui) uma camada; vale para os detectores criados depois do registro."""
+    CAMADAS_DETECCAO[camada.tipo] = camada
 
 class DetectorDPI:
     """
     Detector Avançado de DPI (Dados Pessoais Identificáveis).
-    Camadas:
-    1. Regex Estrita (CPF, CNPJ, Email, Tel, RG, Endereço, Financeiro)
-    2. NLP Spacy (Nomes de Pessoas - PER) - Fallback para Heurística se falhar
-    3. Heurística de Contexto (Solicitação de dados próprios/Anexos/Saúde)
+    Camadas (ver CAMADAS_DETECCAO), da mais barata para a mais cara:
+    1. Regex Estrita (CPF, CNPJ, Email, Tel) + Checksum
+    2. Regex de Contexto (RG, Endereço, Financeiro)
+    3. NLP Spacy (Nomes de Pessoas - PER) - Fallback para Heurística se falhar
+
+    Com `somente_veredito`, só o `contem_dpi` é garantido: a análise termina no primeiro achado
+    que já decide o veredito (ex: um CPF válido) sem rodar o NER, e as evidências e o
+    `nivel_risco` refletem apenas o que foi encontrado até ali.
     """
 
-    def __init__(self, tamanho_modelo: str = "sm"):
-        try:
-            import spacy
-            self.nlp = spacy.load(f"pt_core_news_{tamanho_modelo}")
-        except Exception:
-            self.nlp = None
+    def __init__(self, tamanho_modelo: str = "sm", pre_filtro_ner: bool = False, usar_nlp: bool = True,
+                 instrumentar: bool = False, arquivos_exclusao: Optional[Iterable[str]] = None,
+                 somente_ner: bool = False, camadas: Optional[Iterable[str]] = None,
+                 somente_veredito: bool = False):
+        self.tamanho_modelo = tamanho_modelo
+        self.somente_ner = somente_ner
+        self.somente_veredito = somente_veredito
+        # Instrumentação opcional por camada (tempo, chamadas, achados); None = desligada
+        self.estatisticas = EstatisticasDeteccao() if instrumentar else None
 
-        # --- PADRÕES REGEX REFINADOS ---
-        self.padrao_cpf = re.compile(r'\b\d{3}\.?\d{3}\.?\d{3}-?\d{2}\b')
-        self.padrao_cnpj = re.compile(r'\b\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}\b')
-        self.padrao_email = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+        # Camadas ligadas (None = todas as registradas), ordenadas pelo custo declarado
+        camadas = list(CAMADAS_DETECCAO) if camadas is None else list(dict.fromkeys(camadas))
+        desconhecidas = [tipo for tipo in camadas if tipo not in CAMADAS_DETECCAO]
+        if desconhecidas:
+            raise ValueError(f"Camadas de detecção desconhecidas: {', '.join(desconhecidas)}. "
+                             f"Disponíveis: {', '.join(CAMADAS_DETECCAO)}")
+        self.camadas = sorted((CAMADAS_DETECCAO[tipo] for tipo in camadas), key=lambda c: c.custo)
+        self.tipos_evidencia = tuple(tipo for tipo in CAMADAS_DETECCAO if tipo in camadas)
 
-        # Telefone: Exige DDD e formato de celular/fixo para evitar IDs de processos
-        self.padrao_telefone = re.compile(r'\b(?:\(?\d{2}\)?\s?)(?:9\d{4}|\d{4})[-.\s]?\d{4}\b')
+        # O modelo Spacy só é carregado no primeiro uso (ver propriedade `nlp`), e só se a camada
+        # de nomes estiver ligada. usar_nlp=False força a heurística de nomes (ex: comparações
+        # de desempenho sem Spacy)
+        self._nlp = _NAO_CARREGADO if usar_nlp and 'Nomes' in self.tipos_evidencia else None
 
-        self.padrao_rg = re.compile(r'(?:\b(?:RG|Identidade)\s*[:.]?\s*)(\d{1,2}\.?\d{3}\.?\d{3}-?[\dX]\b|\d{5,9})\b',
-                                    re.IGNORECASE)
-        self.padrao_endereco = re.compile(r'(?i)\b(Rua|Av|Avenida|Logradouro|Alameda)\b\s+.*?\d+')
-        self.padrao_financeiro = re.compile(r'(?i)\b(Banco|Agência|PIX|Cartão|Conta Corrente|Salário)\b\s+[\d\-]{4,}')
+        # Pré-filtro opcional: só envia ao NER textos com sequência de palavras capitalizadas
+        self.pre_filtro_ner = pre_filtro_ner
+        # ner_dispensado: textos em que o modo veredito decidiu antes do NER
+        self.contadores = {'ner_executado': 0, 'ner_ignorado': 0, 'ner_dispensado': 0}
 
         # Termos que reduzem a chance de ser PII (Ex: documentos técnicos)
         self.entidades_comuns = {
@@ -37,8 +150,60 @@ class DetectorDPI:
             "Especificação", "Banco de Dados", "Atenciosamente", "Prefeitura"
         }
 
-    def _validar_cpf_matematico(self, cpf: str) -> bool:
-        numeros = re.sub(r'\D', '', cpf)
+        # Dicionário de exclusão indexado (Aho-Corasick): termos acima + arquivos de gazetteer.
+        # Sem arquivos informados, usa o dicionário do DF distribuído em data/ (se existir).
+        self.dicionario_exclusao = DicionarioExclusao(self.entidades_comuns)
+        if arquivos_exclusao is None:
+            arquivos_exclusao = [ARQUIVO_EXCLUSAO_PADRAO] if os.path.exists(ARQUIVO_EXCLUSAO_PADRAO) else []
+        for arquivo in arquivos_exclusao:
+            self.dicionario_exclusao.carregar_arquivo(arquivo)
+
+        # --- VARREDURA ÚNICA ---
+        # Duas palavras capitalizadas, admitindo uma partícula (da, de, do, dos, das, e) entre elas
+        self.padrao_candidato_nome = re.compile(r'\b[A-ZÀ-ÖØ-Þ][^\W\d_]*\s+(?:(?:d[aeo]s?|e)\s+)?[A-ZÀ-ÖØ-Þ]')
+        camadas_regex = [c for c in self.camadas if c.padrao is not None]
+        self._validadores = {c.tipo: c.validador for c in camadas_regex if c.validador is not None}
+        self._varredura = self._compilar_varredura([c for c in camadas_regex if c.tipo != 'Nomes'])
+        self._varredura_com_nomes = self._compilar_varredura(camadas_regex)
+
+    @property
+    def nlp(self):
+        """Modelo Spacy compartilhado no processo, carregado no primeiro acesso (None = heurística)."""
+        if self._nlp is _NAO_CARREGADO:
+            self._nlp = carregar_modelo_spacy(self.tamanho_modelo, self.somente_ner)
+        return self._nlp
+
+    @staticmethod
+    def _compilar_varredura(camadas: List[CamadaDeteccao]) -> Optional["re.Pattern"]:
+        """
+        LÓGICA COMPLEXA: Combina os padrões das camadas em uma única regex de largura zero.
+        Todos os padrões começam em uma fronteira de palavra (\\b); a alternância dos gatilhos
+        é o prefixo comum mais barato e descarta rapidamente (em C) as posições que não iniciam
+        nenhum candidato. Em cada posição aceita, cada padrão é testado em um lookahead próprio
+        `(?=(?P<tipo>...)|)`, que sempre casa e só preenche o grupo quando o padrão casa.
+        Assim tipos diferentes podem se sobrepor (ex: celular de 11 dígitos que também é CPF),
+        exatamente como nas chamadas `findall` separadas.
+        As camadas que declaram `iniciais` ficam juntas atrás de uma única classe de caracteres
+        (a união das iniciais): nas posições que não passam nela (a maioria, ex: números) nenhum
+        dos seus gatilhos e lookaheads é testado.
+        """
+        if not camadas:
+            return None
+        diretas = [c for c in camadas if not c.iniciais]
+        seletivas = [c for c in camadas if c.iniciais]
+        gatilhos = list(dict.fromkeys(c.gatilho for c in diretas))
+        grupos = ''.join(f'(?=(?P<{c.tipo}>{c.padrao.pattern})|)' for c in diretas)
+        if seletivas:
+            iniciais = ''.join(dict.fromkeys(''.join(c.iniciais for c in seletivas)))
+            seletor = f'(?=[{re.escape(iniciais)}])'
+            gatilhos.append(seletor + '(?:' + '|'.join(dict.fromkeys(c.gatilho for c in seletivas)) + ')')
+            grupos += f'(?:{seletor}' + ''.join(
+                f'(?=(?P<{c.tipo}>{c.padrao.pattern})|)' for c in seletivas) + '|)'
+        return re.compile(rf'\b(?={"|".join(gatilhos)}){grupos}')
+
+    @staticmethod
+    def _validar_cpf_matematico(cpf: str) -> bool:
+        numeros = _padrao_nao_digito.sub('', cpf)
         if len(numeros) != 11 or numeros == numeros[0] * 11: return False
         for i in range(9, 11):
             soma = sum(int(numeros[k]) * ((i + 1) - k) for k in range(i))
@@ -46,9 +211,10 @@ class DetectorDPI:
             if digito != int(numeros[i]): return False
         return True
 
-    def _validar_cnpj_matematico(self, cnpj: str) -> bool:
+    @staticmethod
+    def _validar_cnpj_matematico(cnpj: str) -> bool:
         """Validação algorítmica do CNPJ para eliminar falsos positivos numéricos."""
-        cnpj = re.sub(r'\D', '', cnpj)
+        cnpj = _padrao_nao_digito.sub('', cnpj)
         if len(cnpj) != 14 or cnpj == cnpj[0] * 14: return False
 
         def calcular_digito(peso, numeros):
@@ -63,40 +229,183 @@ class DetectorDPI:
         if int(cnpj[13]) != calcular_digito(pesos2, cnpj[:13]): return False
         return True
 
-    def analisar(self, texto: str, estrito: bool = True) -> Dict[str, Any]:
-        if not isinstance(texto, str) or not texto.strip():
-            return {'contem_dpi': False, 'evidencias': {}}
+    @staticmethod
+    def _validar_rg_matematico(rg: str) -> bool:
+        """
+        Dígito verificador do RG de SP (8 dígitos + DV, pesos 2 a 9; 10 = X), aplicado só quando
+        o texto indica SP como UF emissora (ex: "SSP/SP"): outros estados usam o mesmo formato
+        com outros cálculos. Os demais RGs (ex: do DF, sem DV) são aceitos pelo contexto.
+        """
+        m = _padrao_rg_com_dv.search(rg)
+        if m is None:
+            return True
+        numeros = ''.join(m.groups()[:3])
+        if numeros == numeros[0] * 8: return False
+        uf = _padrao_rg_uf.search(rg)
+        if uf is None or uf.group(1) != 'SP':
+            return True
+        soma = sum(int(n) * peso for n, peso in zip(numeros, range(2, 10)))
+        digito = 11 - soma % 11
+        esperado = 'X' if digito == 10 else '0' if digito == 11 else str(digito)
+        return m.group(4).upper() == esperado
 
-        evidencias = {}
+    @staticmethod
+    def _validar_financeiro(trecho: str) -> bool:
+        """
+        Confere o número conforme a palavra-chave: cartão com 13 a 19 dígitos e dígito de Luhn,
+        agência com 3 a 5 dígitos, conta com 4 ou mais dígitos (ou DV após o hífen) e chave PIX
+        numérica com 8 ou mais. Um ano isolado ("salário 2024", "Cartão 2025") nunca é aceito.
+        """
+        m = _padrao_financeiro.match(trecho)
+        if m is None or _padrao_ano.fullmatch(m.group(2)):
+            return False
+        tipo, numeros = m.group(1).lower(), _padrao_nao_digito.sub('', m.group(2))
+        if tipo == 'cart':
+            if not 13 <= len(numeros) <= 19: return False
+            soma = 0
+            for i, n in enumerate(reversed(numeros)):
+                n = int(n) * (2 if i % 2 else 1)
+                soma += n - 9 if n > 9 else n
+            return soma % 10 == 0
+        if tipo == 'ag':
+            return 3 <= len(numeros) <= 5
+        if tipo == 'conta':
+            return len(numeros) >= 5 or (len(numeros) >= 4 and '-' in m.group(2))
+        return len(numeros) >= 8
 
-        # Validações com Checksum (Alta Precisão)
-        cpfs = [c for c in self.padrao_cpf.findall(texto) if self._validar_cpf_matematico(c)]
-        if cpfs: evidencias['CPF'] = list(set(cpfs))
+    def _detectar_padroes(self, texto: str, incluir_nomes: bool = False,
+                          parar_no_primeiro: bool = False) -> Tuple[Dict[str, List[str]], Posicoes]:
+        """
+        Camada de Regex + Checksum (independente do modelo NLP), em uma única varredura do texto.
+        Com `incluir_nomes`, a heurística de nomes (fallback sem Spacy) entra na mesma varredura.
+        Com `parar_no_primeiro` (modo veredito), a varredura termina no primeiro achado válido
+        que não seja nome, pois ele sozinho já torna `contem_dpi` verdadeiro.
+        Duplicatas são removidas mantendo a ordem de aparição (dict.fromkeys), para que
+        o relatório seja idêntico entre execuções e entre processos; as posições mantêm
+        todas as ocorrências.
 
-        cnpjs = [c for c in self.padrao_cnpj.findall(texto) if self._validar_cnpj_matematico(c)]
-        if cnpjs: evidencias['CNPJ'] = list(set(cnpjs))
+        Returns:
+            Tuple[Dict[str, List[str]], Posicoes]: Evidências e posições de cada ocorrência, por tipo.
+        """
+        padrao = self._varredura_com_nomes if incluir_nomes else self._varredura
+        if padrao is None:
+            return {}, {}
 
-        # Outros PIIs
-        emails = self.padrao_email.findall(texto)
-        if emails: evidencias['Email'] = list(set(emails))
+        est = self.estatisticas
+        if est is not None:
+            t_inicio, t_checksum, n_checksum = perf_counter(), 0.0, 0
 
-        telefones = self.padrao_telefone.findall(texto)
-        if telefones: evidencias['Telefone'] = list(set(telefones))
+        # Grupos na ordem de custo das camadas
+        tipos = tuple(padrao.groupindex)
+        achados = {}
+        posicoes = {}
+        # Fim do último candidato aceito por tipo: reproduz a semântica não sobreposta do findall
+        fim = dict.fromkeys(tipos, 0)
 
-        # Nomes (NLP ou Heurística)
-        nomes = []
-        if self.nlp:
-            doc = self.nlp(texto)
-            nomes = [ent.text for ent in doc.ents if ent.label_ == "PER" and len(ent.text.split()) > 1]
+        for m in padrao.finditer(texto):
+            # Posição aceita pelo gatilho, mas nenhum padrão casou (ex: datas, números soltos)
+            if m.lastindex is None:
+                continue
+            inicio = m.start()
+            for tipo, valor in zip(tipos, m.groups()):
+                if valor is None or inicio < fim[tipo]:
+                    continue
+                fim[tipo] = inicio + len(valor)
+                # Validações com Checksum (Alta Precisão) para CPF/CNPJ
+                validador = self._validadores.get(tipo)
+                if validador is None:
+                    valido = True
+                elif est is None:
+                    valido = validador(valor)
+                else:
+                    t0 = perf_counter()
+                    valido = validador(valor)
+                    t_checksum += perf_counter() - t0
+                    n_checksum += 1
+                if valido:
+                    achados.setdefault(tipo, []).append(valor)
+                    posicoes.setdefault(tipo, []).append([inicio, fim[tipo]])
+                    if parar_no_primeiro and tipo != 'Nomes':
+                        break
+            else:
+                continue
+            break
+
+        if est is not None:
+            est.registrar('regex', perf_counter() - t_inicio - t_checksum)
+            if n_checksum:
+                est.registrar('checksum', t_checksum, n_checksum)
+
+        # Ordem fixa das chaves no relatório
+        tipos = [tipo for tipo in self.tipos_evidencia if tipo in achados]
+        return {tipo: list(dict.fromkeys(achados[tipo])) for tipo in tipos}, {tipo: posicoes[tipo] for tipo in tipos}
+
+    def _extrair_nomes(self, texto: str, doc=None,
+                       posicoes_heuristicas: Optional[List[List[int]]] = None) -> List[List[int]]:
+        """
+        Extrai nomes de pessoas a partir do Doc do Spacy (quando disponível)
+        ou da heurística de capitalização, já aplicando o filtro de entidades comuns.
+
+        Returns:
+            List[List[int]]: Posições (início, fim) no texto de cada ocorrência de nome mantida.
+        """
+        if doc is not None:
+            posicoes = [[ent.start_char, ent.end_char] for ent in doc.ents
+                        if ent.label_ == "PER" and len(ent.text.split()) > 1]
         else:
-            nomes = re.findall(r"(?<![.!?]\s)\b[A-Z][a-zà-ÿ]+\s[A-Z][a-zà-ÿ]+\b", texto)
+            posicoes = posicoes_heuristicas or []
+
+        if not posicoes:
+            return []
+
+        # Filtro de falsos positivos para nomes (uma consulta ao dicionário por nome distinto)
+        t0 = perf_counter()
+        excluidos = {}
+        posicoes_limpas = []
+        for inicio, fim in posicoes:
+            nome = texto[inicio:fim]
+            if nome not in excluidos:
+                excluidos[nome] = self.dicionario_exclusao.contem_termo(nome)
+            if not excluidos[nome] and not self.dicionario_exclusao.lugar_em_contexto(nome, texto, inicio):
+                posicoes_limpas.append([inicio, fim])
+        if self.estatisticas is not None:
+            self.estatisticas.registrar('filtro_entidades', perf_counter() - t0)
+        return posicoes_limpas
 
-        # Filtro de falsos positivos para nomes
-        nomes_limpos = [n for n in nomes if
-                        n not in self.entidades_comuns and not any(e in n for e in self.entidades_comuns)]
-        if nomes_limpos: evidencias['Nomes'] = list(set(nomes_limpos))
+    def assinatura(self, estrito: bool = True) -> str:
+        """
+        Identifica a configuração que determina o resultado de `analisar`.
+        Usada como parte da chave do cache persistente de resultados.
+        """
+        return '|'.join([
+            VERSAO_DETECTOR,
+            f"modelo={self.tamanho_modelo if self.nlp else 'heuristica'}",
+            f"estrito={estrito}",
+            f"pre_filtro_ner={self.pre_filtro_ner}",
+            f"exclusao={self.dicionario_exclusao.assinatura()}",
+            f"camadas={','.join(self.tipos_evidencia)}",
+            f"somente_veredito={self.somente_veredito}",
+        ])
 
+    def _precisa_ner(self, texto: str, estrito: bool = True,
+                     evidencias: Optional[Dict[str, List[str]]] = None) -> bool:
+        """
+        Decide se o texto vai para o NER, atualizando os contadores do pré-filtro.
+        No modo veredito, `evidencias` são os achados das camadas de regex: qualquer achado já
+        decide o `contem_dpi`, e fora do modo estrito um nome isolado não o decidiria.
+        """
+        if evidencias is not None and (evidencias or not estrito):
+            self.contadores['ner_dispensado'] += 1
+            return False
+        if self.pre_filtro_ner and not self.padrao_candidato_nome.search(texto):
+            self.contadores['ner_ignorado'] += 1
+            return False
+        self.contadores['ner_executado'] += 1
+        return True
+
+    def _classificar(self, evidencias: Dict[str, List[str]], posicoes: Posicoes, estrito: bool) -> Dict[str, Any]:
         # --- LÓGICA DE DECISÃO (PESO DE EVIDÊNCIA) ---
+        # Documentos, contas e contatos diretos são de alto risco; um endereço só junto de um nome
         pontuacao_risco = len(evidencias)
         
         if estrito:
@@ -112,6 +421,163 @@ class DetectorDPI:
 
         return {
             'contem_dpi': contem_dpi,
-            'nivel_risco': 'Alto' if any(k in evidencias for k in ['CPF', 'CNPJ', 'Email']) else 'Baixo',
-            'evidencias': evidencias
+            'nivel_risco': 'Alto' if any(k in evidencias for k in TIPOS_ALTO_RISCO)
+                                     or ('Endereco' in evidencias and 'Nomes' in evidencias) else 'Baixo',
+            'evidencias': evidencias,
+            'posicoes': posicoes
         }
+
+    def _analisar_texto(self, texto: str, estrito: bool, doc=None,
+                        achados: Optional[Tuple[Dict[str, List[str]], Posicoes]] = None) -> Dict[str, Any]:
+        # Sem modelo Spacy, a heurística de nomes é feita na mesma varredura das regex.
+        # Com modelo e sem Doc (texto descartado pelo pré-filtro), não há nomes a procurar.
+        # `achados` já vem preenchido quando o modo veredito rodou as regex antes do NER.
+        if achados is None:
+            achados = self._detectar_padroes(texto, incluir_nomes=self.nlp is None,
+                                             parar_no_primeiro=self.somente_veredito)
+        evidencias, posicoes = achados
+        evidencias.pop('Nomes', None)
+
+        # Nomes (NLP ou Heurística)
+        posicoes_nomes = self._extrair_nomes(texto, doc, posicoes.pop('Nomes', None))
+        if posicoes_nomes:
+            evidencias['Nomes'] = list(dict.fromkeys(texto[inicio:fim] for inicio, fim in posicoes_nomes))
+            posicoes['Nomes'] = posicoes_nomes
+
+        if self.estatisticas is not None:
+            self.estatisticas.registrar_achados(evidencias)
+        return self._classificar(evidencias, posicoes, estrito)
+
+    def _varrer_antes_do_ner(self, texto: str) -> Optional[Tuple[Dict[str, List[str]], Posicoes]]:
+        """
+        Modo veredito com Spacy: as camadas de regex (baratas) rodam antes do NER, parando no
+        primeiro achado. Fora desse modo devolve None e as regex rodam depois do NER, como sempre.
+        """
+        if not self.somente_veredito or not self.nlp:
+            return None
+        return self._detectar_padroes(texto, parar_no_primeiro=True)
+
+    def _medir_ner(self, docs):
+        """Acumula na camada 'ner' o tempo gasto dentro do `nlp.pipe` até cada Doc ficar pronto."""
+        while True:
+            t0 = perf_counter()
+            try:
+                doc, contexto = next(docs)
+            except StopIteration:
+                return
+            self.estatisticas.registrar('ner', perf_counter() - t0, 1 if contexto[1] else 0)
+            yield doc, contexto
+
+    def analisar(self, texto: str, estrito: bool = True) -> Dict[str, Any]:
+        """
+        Analisa um texto.
+
+        Returns:
+            Dict[str, Any]: `contem_dpi`, `nivel_risco`, `evidencias` (trechos distintos por tipo) e
+            `posicoes` ([início, fim] em caracteres de cada ocorrência, por tipo; ver
+            `utilitarios.mascarar_texto`). Textos vazios só trazem `contem_dpi` e `evidencias`.
+        """
+        if not isinstance(texto, str) or not texto.strip():
+            return {'contem_dpi': False, 'evidencias': {}}
+
+        doc = None
+        achados = self._varrer_antes_do_ner(texto)
+        if self.nlp and self._precisa_ner(texto, estrito, None if achados is None else achados[0]):
+            t0 = perf_counter()
+            doc = self.nlp(texto)
+            if self.estatisticas is not None:
+                self.estatisticas.registrar('ner', perf_counter() - t0)
+        return self._analisar_texto(texto, estrito, doc, achados)
+
+    def analisar_lote(self, textos: Iterable[str], estrito: bool = True,
+                      batch_size: int = 256, n_process: int = 1) -> List[Dict[str, Any]]:
+        """
+        Analisa uma sequência de textos de uma só vez.
+
+        LÓGICA COMPLEXA: o NER é a etapa mais cara, então os textos são enviados em
+        lotes para o `nlp.pipe` do Spacy em vez de uma chamada `self.nlp(texto)` por
+        registro. As camadas de Regex/Checksum rodam conforme cada Doc sai do pipe.
+        Textos vazios, não-string ou descartados pelo pré-filtro seguem pelo pipe como ""
+        (para manter a ordem); o texto original viaja no contexto da tupla. No modo veredito,
+        os textos já decididos pelas regex também seguem como "" e não passam pelo NER.
+
+        Args:
+            textos (Iterable[str]): Textos a analisar (consumidos sob demanda).
+            estrito (bool): Mesmo significado de `analisar`.
+            batch_size (int): Tamanho do lote enviado ao Spacy.
+            n_process (int): Número de processos usados pelo `nlp.pipe`.
+
+        Returns:
+            List[Dict[str, Any]]: Um resultado por texto, na mesma ordem e formato de `analisar`.
+        """
+        validos = ((t if isinstance(t, str) and t.strip() else None) for t in textos)
+
+        if not self.nlp:
+            return [self._analisar_texto(t, estrito) if t is not None else {'contem_dpi': False, 'evidencias': {}}
+                    for t in validos]
+
+        def preparar(texto):
+            if texto is None:
+                return "", (None, False, None)
+            achados = self._varrer_antes_do_ner(texto)
+            if self._precisa_ner(texto, estrito, None if achados is None else achados[0]):
+                return texto, (texto, True, achados)
+            return "", (texto, False, achados)
+
+        pares = (preparar(t) for t in validos)
+
+        docs = self.nlp.pipe(pares, as_tuples=True, batch_size=batch_size, n_process=n_process)
+        if self.estatisticas is not None:
+            docs = self._medir_ner(docs)
+
+        resultados = []
+        for doc, (texto, usar_doc, achados) in docs:
+            if texto is None:
+                resultados.append({'contem_dpi': False, 'evidencias': {}})
+            else:
+                resultados.append(self._analisar_texto(texto, estrito, doc if usar_doc else None, achados))
+        return resultados
+
+
+# --- CAMADAS PADRÃO ---
+# Custo relativo declarado: 1 = regex com gatilho numérico, 2 = regex com gatilho em palavras,
+# 3 = regex de contexto (palavra-chave + número), 10 = NER do Spacy.
+registrar_camada(CamadaDeteccao('CPF', 1, r'\b\d{3}\.?\d{3}\.?\d{3}-?\d{2}\b', r'[\d(]',
+                                validador=DetectorDPI._validar_cpf_matematico))
+registrar_camada(CamadaDeteccao('CNPJ', 1, r'\b\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}\b', r'[\d(]',
+                                validador=DetectorDPI._validar_cnpj_matematico))
+registrar_camada(CamadaDeteccao('Email', 2, r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+                                r'[A-Za-z0-9._%+-]+@'))
+# Telefone: Exige DDD e formato de celular/fixo para evitar IDs de processos
+registrar_camada(CamadaDeteccao('Telefone', 1, r'\b(?:\(?\d{2}\)?\s?)(?:9\d{4}|\d{4})[-.\s]?\d{4}\b', r'[\d(]'))
+
+# RG, Endereço e Financeiro: palavra-chave seguida de número. Nenhum quantificador atravessa
+# o texto inteiro: o trecho entre logradouro e número tem no máximo 60 caracteres
+# (o antigo `.*?\d+` podia ser quadrático em textos longos sem números).
+registrar_camada(CamadaDeteccao(
+    'RG', 3,
+    r'(?i:\b(?:RG|Identidade)\b\s*(?:n[º°o.]\s*)?[:.]?\s*)(?:\d{1,2}\.?\d{3}\.?\d{3}(?:-?[\dXx])?|\d{5,9})\b'
+    # Órgão emissor e UF, quando informados (ex: "SSP/SP"): decidem o cálculo do DV
+    rf'(?:\s?[-/]?\s?(?:[A-Z]{{2,6}}\s?[-/]\s?)?(?:{_UFS})\b)?',
+    r'(?i:RG|Identidade)\b', iniciais='RrIi', validador=DetectorDPI._validar_rg_matematico))
+registrar_camada(CamadaDeteccao(
+    'Endereco', 3,
+    r'(?:(?i:\b(?:Rua|Av|Avenida|Logradouro|Alameda|Travessa)\b)\.?\s+[^\d\n]{0,60}\d+'
+    # Endereçamento do DF (ex: SQS 308, QNM 12, SHIN QI 5)
+    r'|\b(?:SQ[NS]|SHI[NS]|QN[A-Z]|Q[ILRS]|SCL[NS]|CL[NS])\s+\d{1,3}\b)',
+    r'(?i:Rua|Av|Avenida|Logradouro|Alameda|Travessa)\b|SQ[NS]|SHI[NS]|QN[A-Z]|Q[ILRS]|SCL[NS]|CL[NS]',
+    iniciais='RrAaLlTtSQC'))
+# Financeiro: agência, conta, cartão ou chave PIX seguidos de um número no formato do tipo
+# (ver _validar_financeiro); "Banco"/"Salário" + número costuma ser ano ou código, não DPI.
+registrar_camada(CamadaDeteccao(
+    'Financeiro', 3,
+    r'(?i:\b(?:Ag[êe]ncia|Conta(?:\s(?:Corrente|Poupan[çc]a))?|Cart[ãa]o(?:\sde\sCr[ée]dito)?|PIX)\b)'
+    r'\s*(?:n[º°o.]\s*)?[:.]?\s*\d(?:[\d.\-]|\s(?=\d)){2,24}(?:-[\dXx])?\b',
+    r'(?i:Ag[êe]ncia|Conta|Cart[ãa]o|PIX)\b', iniciais='AaCcPp', validador=DetectorDPI._validar_financeiro))
+
+# Nomes: NER do Spacy; o padrão é a heurística de capitalização usada quando não há modelo
+registrar_camada(CamadaDeteccao('Nomes', 10, r"(?<![.!?]\s)\b[A-Z][a-zà-ÿ]+\s[A-Z][a-zà-ÿ]+\b",
+                                r'[A-Z][a-zà-ÿ]+\s[A-Z]'))
+
+# Tipos de evidência das camadas padrão, na ordem em que aparecem nos resultados
+TIPOS_EVIDENCIA = tuple(CAMADAS_DETECCAO)
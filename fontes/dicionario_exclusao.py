@@ -0,0 +1,148 @@
+import hashlib
+import os
+import re
+from collections import deque
+from typing import Dict, Iterable, List
+
+from fontes.utilitarios import normalizar_acentos
+
+ARQUIVO_EXCLUSAO_PADRAO = os.path.join(os.path.dirname(__file__), '..', 'data', 'entidades_exclusao_df.txt')
+
+# Marcador, no arquivo, dos lugares que também são nomes de pessoa (ex: "Vicente Pires")
+PREFIXO_LUGAR_AMBIGUO = '?'
+# Texto (normalizado) que, imediatamente antes de um lugar ambíguo, indica que é o lugar
+_PADRAO_CONTEXTO_LUGAR = re.compile(
+    r'(?:\b(?:regiao administrativa|administracao regional|regiao|cidade|bairro|ra)(?:\s+(?:de|do|da))?'
+    r'|\bmorador(?:a|es)?\s+(?:de|do|da)|\b(?:em|no|na))\s+$')
+_JANELA_CONTEXTO = 40
+
+
+class DicionarioExclusao:
+    """
+    Dicionário de termos que descartam um candidato a nome (órgãos, instituições, lugares do DF).
+
+    LÓGICA COMPLEXA: os termos são normalizados (sem acento, casefold) e indexados em um
+    autômato Aho-Corasick sobre caracteres. A busca percorre o texto uma única vez, em tempo
+    proporcional ao tamanho do texto e independente da quantidade de termos; um termo só
+    conta quando aparece como palavra(s) inteira(s) no texto.
+
+    Lugares que também são nomes de pessoa (marcados com '?' no arquivo) não entram no
+    autômato: só descartam um candidato igual a eles e precedido de contexto de lugar
+    ("Região Administrativa de", "moro em", ...), ver `lugar_em_contexto`.
+    """
+
+    def __init__(self, termos: Iterable[str] = ()):
+        self.termos = set()
+        self.lugares_ambiguos = set()
+        self._transicoes: List[Dict[str, int]] = [{}]
+        self._falha: List[int] = [0]
+        # Comprimentos dos termos que terminam em cada estado (incluindo os herdados pela falha)
+        self._saidas: List[List[int]] = [[]]
+        self._compilado = True
+        self.adicionar_varios(termos)
+
+    @staticmethod
+    def normalizar(texto: str) -> str:
+        return normalizar_acentos(texto).casefold()
+
+    def __len__(self) -> int:
+        return len(self.termos)
+
+    def adicionar(self, termo: str) -> None:
+        termo = ' '.join(self.normalizar(termo).split())
+        if not termo or termo in self.termos:
+            return
+        self.termos.add(termo)
+        estado = 0
+        for caractere in termo:
+            proximo = self._transicoes[estado].get(caractere)
+            if proximo is None:
+                proximo = len(self._transicoes)
+                self._transicoes[estado][caractere] = proximo
+                self._transicoes.append({})
+                self._falha.append(0)
+                self._saidas.append([])
+            estado = proximo
+        self._saidas[estado].append(len(termo))
+        self._compilado = False
+
+    def adicionar_varios(self, termos: Iterable[str]) -> None:
+        for termo in termos:
+            self.adicionar(termo)
+
+    def adicionar_lugar_ambiguo(self, lugar: str) -> None:
+        lugar = ' '.join(self.normalizar(lugar).split())
+        if lugar:
+            self.lugares_ambiguos.add(lugar)
+
+    def carregar_arquivo(self, caminho: str) -> int:
+        """
+        Carrega um arquivo texto (UTF-8) com um termo por linha; linhas vazias e
+        iniciadas por '#' são ignoradas, e as iniciadas por '?' são lugares ambíguos.
+
+        Returns:
+            int: Quantidade de termos novos adicionados.
+        """
+        antes = len(self.termos) + len(self.lugares_ambiguos)
+        with open(caminho, encoding='utf-8') as arquivo:
+            for linha in arquivo:
+                linha = linha.strip()
+                if linha.startswith(PREFIXO_LUGAR_AMBIGUO):
+                    self.adicionar_lugar_ambiguo(linha[len(PREFIXO_LUGAR_AMBIGUO):])
+                elif not linha.startswith('#'):
+                    self.adicionar(linha)
+        return len(self.termos) + len(self.lugares_ambiguos) - antes
+
+    def assinatura(self) -> str:
+        """Hash curto do conteúdo do dicionário (entra na chave do cache de resultados)."""
+        conteudo = sorted(self.termos) + sorted(PREFIXO_LUGAR_AMBIGUO + lugar for lugar in self.lugares_ambiguos)
+        return hashlib.sha256('\n'.join(conteudo).encode('utf-8')).hexdigest()[:16]
+
+    def _compilar(self) -> None:
+        # Busca em largura: a falha de um estado é o maior sufixo próprio que também é prefixo
+        fila = deque()
+        for proximo in self._transicoes[0].values():
+            self._falha[proximo] = 0
+            fila.append(proximo)
+        while fila:
+            estado = fila.popleft()
+            for caractere, proximo in self._transicoes[estado].items():
+                falha = self._falha[estado]
+                while falha and caractere not in self._transicoes[falha]:
+                    falha = self._falha[falha]
+                self._falha[proximo] = self._transicoes[falha].get(caractere, 0)
+                self._saidas[proximo] = list(dict.fromkeys(
+                    self._saidas[proximo] + self._saidas[self._falha[proximo]]))
+                fila.append(proximo)
+        self._compilado = True
+
+    def contem_termo(self, texto: str) -> bool:
+        """Indica se algum termo do dicionário aparece no texto como palavra(s) inteira(s)."""
+        if not self._compilado:
+            self._compilar()
+        texto = self.normalizar(texto)
+        transicoes, falha, saidas = self._transicoes, self._falha, self._saidas
+        estado = 0
+        for posicao, caractere in enumerate(texto):
+            while estado and caractere not in transicoes[estado]:
+                estado = falha[estado]
+            estado = transicoes[estado].get(caractere, 0)
+            if saidas[estado] and (posicao + 1 == len(texto) or not texto[posicao + 1].isalnum()):
+                for comprimento in saidas[estado]:
+                    inicio = posicao + 1 - comprimento
+                    if inicio == 0 or not texto[inicio - 1].isalnum():
+                        return True
+        return False
+
+    def lugar_em_contexto(self, nome: str, texto: str, inicio: int) -> bool:
+        """
+        Indica se o candidato `nome`, que começa em `texto[inicio]`, começa por um lugar
+        ambíguo precedido de contexto de lugar (ex: "Região Administrativa de Vicente Pires").
+        """
+        if not self.lugares_ambiguos:
+            return False
+        nome = ' '.join(self.normalizar(nome).split()) + ' '
+        if not any(nome.startswith(lugar + ' ') for lugar in self.lugares_ambiguos):
+            return False
+        anterior = self.normalizar(texto[max(0, inicio - _JANELA_CONTEXTO):inicio])
+        return _PADRAO_CONTEXTO_LUGAR.search(anterior) is not None
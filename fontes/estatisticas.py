@@ -0,0 +1,67 @@
+from collections import Counter
+from typing import Any, Dict, Optional
+
+
+class EstatisticasDeteccao:
+    """
+    Instrumentação das camadas do DetectorDPI: tempo acumulado e número de chamadas por camada
+    (regex, checksum, ner, filtro_entidades) e quantidade de achados por tipo de entidade.
+
+    O conteúdo é convertido em dicionário simples (`como_dict`) para atravessar processos e
+    pode ser somado com `mesclar`, o que permite agregar as estatísticas de vários workers.
+    """
+
+    CAMADAS = ('regex', 'checksum', 'ner', 'filtro_entidades')
+
+    def __init__(self):
+        self.tempo = Counter()
+        self.chamadas = Counter()
+        self.achados = Counter()
+        self.textos = 0
+
+    def registrar(self, camada: str, segundos: float, chamadas: int = 1) -> None:
+        self.tempo[camada] += segundos
+        self.chamadas[camada] += chamadas
+
+    def registrar_achados(self, evidencias: Dict[str, Any]) -> None:
+        self.textos += 1
+        for tipo, valores in evidencias.items():
+            self.achados[tipo] += len(valores)
+
+    def mesclar(self, outra: "Optional[EstatisticasDeteccao | Dict[str, Any]]") -> None:
+        """Soma outra instância (ou o resultado de `como_dict`) a esta."""
+        if outra is None:
+            return
+        if isinstance(outra, EstatisticasDeteccao):
+            outra = outra.como_dict()
+        self.textos += outra.get('textos', 0)
+        for camada, dados in outra.get('camadas', {}).items():
+            self.registrar(camada, dados['tempo_s'], dados['chamadas'])
+        self.achados.update(outra.get('achados', {}))
+
+    def zerar(self) -> None:
+        self.tempo.clear()
+        self.chamadas.clear()
+        self.achados.clear()
+        self.textos = 0
+
+    def como_dict(self) -> Dict[str, Any]:
+        camadas = [c for c in self.CAMADAS if c in self.chamadas] + \
+                  [c for c in self.chamadas if c not in self.CAMADAS]
+        return {
+            'textos': self.textos,
+            'camadas': {c: {'chamadas': self.chamadas[c], 'tempo_s': self.tempo[c]} for c in camadas},
+            'achados': dict(self.achados),
+        }
+
+    def formatar(self) -> str:
+        """Tabela legível para o relatório do terminal."""
+        dados = self.como_dict()
+        linhas = [f"Textos analisados: {dados['textos']}",
+                  f"{'Camada':<18}{'Chamadas':>10}{'Tempo total (s)':>18}{'Média (ms)':>12}"]
+        for camada, valores in dados['camadas'].items():
+            media = valores['tempo_s'] / valores['chamadas'] * 1000 if valores['chamadas'] else 0.0
+            linhas.append(f"{camada:<18}{valores['chamadas']:>10}{valores['tempo_s']:>18.3f}{media:>12.3f}")
+        if dados['achados']:
+            linhas.append("Achados por tipo: " + ', '.join(f"{k}={v}" for k, v in dados['achados'].items()))
+        return '\n'.join(linhas)
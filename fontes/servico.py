@@ -0,0 +1,232 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from fontes.detectores import DetectorDPI, VERSAO_DETECTOR
+
+# Limite do corpo das requisições (evita que um único POST esgote a memória do serviço)
+TAMANHO_MAXIMO_CORPO = 10 * 2 ** 20
+
+
+class _Pedido:
+    """Textos de uma requisição aguardando o micro-lote."""
+
+    def __init__(self, textos: List[str], estrito: bool):
+        self.textos = textos
+        self.estrito = estrito
+        self.resultados: Optional[List[Dict[str, Any]]] = None
+        self.erro: Optional[BaseException] = None
+        self.concluido = threading.Event()
+
+
+class ServicoDPI:
+    """
+    Mantém um DetectorDPI carregado e agrupa as requisições concorrentes em micro-lotes.
+
+    LÓGICA COMPLEXA: as threads do servidor HTTP apenas enfileiram pedidos; uma única thread
+    de processamento retira o primeiro pedido, aguarda até `espera_max_s` por outros (ou até
+    reunir `tamanho_lote` textos) e envia tudo de uma vez ao `analisar_lote`, de modo que o
+    NER roda em lote (nlp.pipe) e o detector nunca é usado por duas threads ao mesmo tempo.
+    """
+
+    def __init__(self, detector: DetectorDPI, tamanho_lote: int = 64, espera_max_s: float = 0.005):
+        self.detector = detector
+        # Carrega o modelo agora (carga tardia no detector), e não na primeira requisição
+        detector.nlp
+        self.tamanho_lote = tamanho_lote
+        self.espera_max_s = espera_max_s
+        self._fila: "queue.Queue[Optional[_Pedido]]" = queue.Queue()
+        self._trava = threading.Lock()
+        self._latencias_ms = deque(maxlen=1000)
+        self.inicio = time.time()
+        self.requisicoes = 0
+        self.textos = 0
+        self.lotes = 0
+        self.erros = 0
+        self._thread = threading.Thread(target=self._processar, name='micro-lotes-dpi', daemon=True)
+        self._thread.start()
+
+    def analisar(self, textos: List[str], estrito: bool = True) -> List[Dict[str, Any]]:
+        """Analisa os textos no próximo micro-lote e aguarda o resultado (um por texto, na ordem)."""
+        inicio = time.perf_counter()
+        pedido = _Pedido(textos, estrito)
+        self._fila.put(pedido)
+        pedido.concluido.wait()
+        if pedido.erro is not None:
+            raise pedido.erro
+        with self._trava:
+            self.requisicoes += 1
+            self._latencias_ms.append((time.perf_counter() - inicio) * 1000)
+        return pedido.resultados
+
+    def _processar(self) -> None:
+        while True:
+            pedido = self._fila.get()
+            if pedido is None:
+                return
+            pedidos = [pedido]
+            quantidade = len(pedido.textos)
+            limite = time.perf_counter() + self.espera_max_s
+            while quantidade < self.tamanho_lote:
+                restante = limite - time.perf_counter()
+                if restante <= 0:
+                    break
+                try:
+                    proximo = self._fila.get(timeout=restante)
+                except queue.Empty:
+                    break
+                if proximo is None:
+                    self._fila.put(None)
+                    break
+                pedidos.append(proximo)
+                quantidade += len(proximo.textos)
+
+            # O modo estrito é parâmetro do lote inteiro: um lote por valor presente
+            for estrito in {p.estrito for p in pedidos}:
+                grupo = [p for p in pedidos if p.estrito == estrito]
+                try:
+                    resultados = self.detector.analisar_lote(
+                        [t for p in grupo for t in p.textos], estrito=estrito, batch_size=self.tamanho_lote)
+                except Exception as e:
+                    with self._trava:
+                        self.erros += len(grupo)
+                    for p in grupo:
+                        p.erro = e
+                        p.concluido.set()
+                    continue
+                with self._trava:
+                    self.lotes += 1
+                    self.textos += len(resultados)
+                posicao = 0
+                for p in grupo:
+                    p.resultados = resultados[posicao:posicao + len(p.textos)]
+                    posicao += len(p.textos)
+                    p.concluido.set()
+
+    def saude(self) -> Dict[str, Any]:
+        return {
+            'status': 'ok' if self._thread.is_alive() else 'parado',
+            'versao_detector': VERSAO_DETECTOR,
+            'modelo': self.detector.tamanho_modelo if self.detector.nlp is not None else 'heuristica',
+        }
+
+    def metricas(self) -> Dict[str, Any]:
+        with self._trava:
+            latencias = sorted(self._latencias_ms)
+            metricas = {
+                'tempo_ativo_s': time.time() - self.inicio,
+                'requisicoes': self.requisicoes,
+                'erros': self.erros,
+                'textos': self.textos,
+                'lotes': self.lotes,
+                'tamanho_medio_lote': self.textos / self.lotes if self.lotes else 0.0,
+                'fila': self._fila.qsize(),
+                'latencia_media_ms': sum(latencias) / len(latencias) if latencias else 0.0,
+                'latencia_p99_ms': latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))] if latencias else 0.0,
+            }
+        metricas['contadores'] = dict(self.detector.contadores)
+        if self.detector.estatisticas is not None:
+            metricas['estatisticas'] = self.detector.estatisticas.como_dict()
+        return metricas
+
+    def parar(self) -> None:
+        self._fila.put(None)
+        self._thread.join()
+
+
+class _ManipuladorDPI(BaseHTTPRequestHandler):
+    """
+    Rotas (JSON):
+      POST /analisar       {"texto": "...", "estrito": true}   -> resultado de `analisar`
+      POST /analisar/lote  {"textos": [...], "estrito": true}  -> {"resultados": [...]}
+      GET  /saude                                              -> estado do serviço
+      GET  /metricas                                           -> contadores e latências
+    """
+
+    servico: ServicoDPI = None
+    protocol_version = 'HTTP/1.1'
+
+    def _responder(self, status: int, corpo: Dict[str, Any]) -> None:
+        dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        if self.path == '/saude':
+            self._responder(200, self.servico.saude())
+        elif self.path == '/metricas':
+            self._responder(200, self.servico.metricas())
+        else:
+            self._responder(404, {'erro': f'Rota não encontrada: {self.path}'})
+
+    def do_POST(self):
+        if self.path not in ('/analisar', '/analisar/lote'):
+            self._responder(404, {'erro': f'Rota não encontrada: {self.path}'})
+            return
+        try:
+            tamanho = int(self.headers.get('Content-Length') or 0)
+            if tamanho < 0:
+                raise ValueError('Content-Length negativo')
+        except ValueError as e:
+            # Sem um tamanho válido não há como saber onde o corpo termina
+            self.close_connection = True
+            self._responder(400, {'erro': f'Requisição inválida: {e}'})
+            return
+        if tamanho > TAMANHO_MAXIMO_CORPO:
+            self.close_connection = True
+            self._responder(413, {'erro': 'Corpo da requisição muito grande.'})
+            return
+        try:
+            corpo = json.loads(self.rfile.read(tamanho) or b'{}')
+            estrito = corpo.get('estrito', True)
+            if not isinstance(estrito, bool):
+                raise ValueError("'estrito' deve ser true ou false")
+            if self.path == '/analisar':
+                if not isinstance(corpo['texto'], str):
+                    raise ValueError("'texto' deve ser uma string")
+                textos = [corpo['texto']]
+            else:
+                textos = corpo['textos']
+                if not isinstance(textos, list):
+                    raise ValueError("'textos' deve ser uma lista")
+                if not all(isinstance(t, str) for t in textos):
+                    raise ValueError("'textos' deve conter apenas strings")
+        except (ValueError, KeyError, AttributeError) as e:
+            self._responder(400, {'erro': f'Requisição inválida: {e}'})
+            return
+
+        try:
+            resultados = self.servico.analisar(textos, estrito)
+        except Exception as e:
+            self._responder(500, {'erro': str(e)})
+            return
+        self._responder(200, resultados[0] if self.path == '/analisar' else {'resultados': resultados})
+
+    def log_message(self, formato, *args):
+        # Sem log por requisição no terminal (o volume esperado é alto); ver /metricas
+        pass
+
+
+def criar_servidor(servico: ServicoDPI, host: str = '127.0.0.1', porta: int = 8000) -> ThreadingHTTPServer:
+    """
+    Cria o servidor HTTP (uma thread por conexão) ligado ao serviço informado.
+
+    Args:
+        servico (ServicoDPI): Serviço com o detector já carregado.
+        host (str): Endereço de escuta.
+        porta (int): Porta de escuta (0 escolhe uma porta livre).
+
+    Returns:
+        ThreadingHTTPServer: Servidor pronto para `serve_forever`.
+    """
+    manipulador = type('ManipuladorDPI', (_ManipuladorDPI,), {'servico': servico})
+    servidor = ThreadingHTTPServer((host, porta), manipulador)
+    servidor.daemon_threads = True
+    return servidor
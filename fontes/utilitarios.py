@@ -1,5 +1,14 @@
+import hashlib
 import re
 import unicodedata
+from typing import TYPE_CHECKING, Dict, List
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Os mesmos espaços do `\s` do Python, explícitos: com strings pyarrow (padrão do pandas 3) a
+# regex roda no RE2, cujo `\s` só reconhece os espaços ASCII (ex: manteria U+00A0 e U+2028)
+_PADRAO_ESPACOS = '[\t\n\x0b\x0c\r\x1c-\x1f \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]+'
 
 def limpar_texto(texto: str) -> str:
     """
@@ -20,6 +29,31 @@ def limpar_texto(texto: str) -> str:
     
     return texto
 
+def coagir_texto_serie(serie: "pd.Series") -> "pd.Series":
+    """
+    Converte uma coluna para texto tratando valores ausentes (NaN/None) como string vazia.
+    
+    Args:
+        serie (pd.Series): Coluna original (qualquer dtype).
+        
+    Returns:
+        pd.Series: Coluna de strings.
+    """
+    return serie.astype(object).where(serie.notna(), '').astype(str)
+
+def limpar_serie(serie: "pd.Series") -> "pd.Series":
+    """
+    Versão vetorizada de `limpar_texto` para uma coluna inteira do DataFrame.
+    
+    Args:
+        serie (pd.Series): Coluna original (qualquer dtype).
+        
+    Returns:
+        pd.Series: Coluna de textos limpos.
+    """
+    # Os espaços já cobrem \n e \r: uma única substituição equivale às três operações de limpar_texto
+    return coagir_texto_serie(serie).str.replace(_PADRAO_ESPACOS, ' ', regex=True).str.strip(' ')
+
 def normalizar_acentos(texto: str) -> str:
     """
     Remove acentos do texto.
@@ -32,3 +66,45 @@ def normalizar_acentos(texto: str) -> str:
     """
     return "".join(c for c in unicodedata.normalize('NFD', texto)
                   if unicodedata.category(c) != 'Mn')
+
+def impressao_digital(texto: str) -> str:
+    """
+    Gera um hash curto e estável do texto (já limpo), usado para reconhecer
+    linhas inalteradas entre execuções.
+    
+    Args:
+        texto (str): Texto limpo.
+        
+    Returns:
+        str: Hash hexadecimal de 32 caracteres.
+    """
+    return hashlib.blake2b(texto.encode('utf-8'), digest_size=16).hexdigest()
+
+def mascarar_texto(texto: str, posicoes: Dict[str, List[List[int]]]) -> str:
+    """
+    Substitui cada trecho encontrado pelo tipo da evidência entre colchetes (ex: "[CPF]"),
+    usando as posições devolvidas por `DetectorDPI.analisar` (sem nova busca no texto).
+    Trechos sobrepostos (ex: celular que também casa como CPF) viram uma única marcação,
+    com o tipo do trecho que começa primeiro (no empate, o mais longo).
+    
+    Args:
+        texto (str): Texto analisado (o mesmo passado ao detector).
+        posicoes (Dict[str, List[List[int]]]): Posições [início, fim] por tipo de evidência.
+        
+    Returns:
+        str: Texto mascarado.
+    """
+    trechos = sorted(((inicio, fim, tipo) for tipo, lista in posicoes.items() for inicio, fim in lista),
+                     key=lambda trecho: (trecho[0], -trecho[1]))
+    partes = []
+    cursor = 0
+    for inicio, fim, tipo in trechos:
+        if inicio < cursor:
+            # Sobreposto a uma marcação já feita: ela passa a cobrir também este trecho
+            cursor = max(cursor, fim)
+            continue
+        partes.append(texto[cursor:inicio])
+        partes.append(f'[{tipo}]')
+        cursor = fim
+    partes.append(texto[cursor:])
+    return ''.join(partes)
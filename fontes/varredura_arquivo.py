@@ -0,0 +1,97 @@
+import mmap
+import os
+import re
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from fontes.detectores import CAMADAS_DETECCAO, DetectorDPI
+
+# Camadas usadas por padrão na varredura de arquivos (documentos e contatos)
+CAMADAS_PADRAO_ARQUIVO = ('CPF', 'CNPJ', 'Email', 'Telefone')
+
+# Janela lida por vez e trecho extra além dela (achados que começam perto do fim da janela
+# precisam ver os bytes seguintes; deve ser maior que o maior achado possível)
+TAMANHO_JANELA = 16 * 2 ** 20
+SOBREPOSICAO = 64 * 2 ** 10
+
+# Achado: (tipo, valor, byte_inicio, byte_fim, linha)
+Achado = Tuple[str, str, int, int, int]
+
+
+class VarredorArquivo:
+    """
+    Varre arquivos texto/log de qualquer tamanho com as camadas de regex + checksum do detector,
+    diretamente sobre os bytes do arquivo mapeado em memória (mmap).
+
+    LÓGICA COMPLEXA: a varredura única do DetectorDPI é recompilada como regex de bytes e roda
+    sobre o mmap em janelas de `tamanho_janela` bytes, cada uma estendida por `sobreposicao`
+    bytes da janela seguinte. Só são aceitos os achados que começam dentro da janela; os que
+    começam perto do fim são vistos por inteiro graças à sobreposição, e os que começam na
+    sobreposição ficam para a próxima janela, de modo que nada é perdido nem repetido na
+    fronteira. O arquivo nunca é copiado inteiro para a memória do Python: apenas os valores
+    encontrados e, para contar as linhas, no máximo uma janela por vez.
+    Só camadas com padrão ASCII são aceitas; em bytes, `\\b` e as classes de caracteres
+    consideram apenas ASCII (ex: um número colado a uma letra acentuada é aceito).
+    """
+
+    def __init__(self, camadas: Optional[Iterable[str]] = None, tamanho_janela: int = TAMANHO_JANELA,
+                 sobreposicao: int = SOBREPOSICAO):
+        camadas = list(dict.fromkeys(CAMADAS_PADRAO_ARQUIVO if camadas is None else camadas))
+        nao_suportadas = [tipo for tipo in camadas if tipo not in CAMADAS_DETECCAO
+                          or CAMADAS_DETECCAO[tipo].padrao is None
+                          or not CAMADAS_DETECCAO[tipo].padrao.pattern.isascii()]
+        if nao_suportadas:
+            raise ValueError(f"Camadas não suportadas na varredura de arquivos: {', '.join(nao_suportadas)}")
+        self.camadas = sorted((CAMADAS_DETECCAO[tipo] for tipo in camadas), key=lambda c: c.custo)
+        self.tamanho_janela = tamanho_janela
+        self.sobreposicao = sobreposicao
+        varredura = DetectorDPI._compilar_varredura(self.camadas)
+        self._varredura = re.compile(varredura.pattern.encode('ascii')) if varredura is not None else None
+        self._validadores = {c.tipo: c.validador for c in self.camadas if c.validador is not None}
+
+    def varrer(self, caminho: str, ao_avancar: Optional[Callable[[int], None]] = None) -> Iterator[Achado]:
+        """
+        Percorre o arquivo devolvendo cada achado válido, na ordem em que aparece.
+
+        Args:
+            caminho (str): Arquivo a varrer.
+            ao_avancar (Callable[[int], None]): Chamada ao fim de cada janela com a quantidade
+                de bytes processados nela (ex: atualizar uma barra de progresso).
+
+        Yields:
+            Achado: (tipo, valor, byte_inicio, byte_fim, linha), com a linha contada a partir de 1.
+        """
+        tamanho = os.path.getsize(caminho)
+        # Arquivo vazio não pode ser mapeado (e não tem achados)
+        if tamanho == 0 or self._varredura is None:
+            return
+        with open(caminho, 'rb') as arquivo, \
+                mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as dados:
+            tipos = tuple(self._varredura.groupindex)
+            # Fim do último achado aceito por tipo: mesma semântica não sobreposta do detector
+            fim = dict.fromkeys(tipos, 0)
+            linha, contado = 1, 0
+            for inicio_janela in range(0, tamanho, self.tamanho_janela):
+                fim_janela = min(inicio_janela + self.tamanho_janela, tamanho)
+                limite = min(fim_janela + self.sobreposicao, tamanho)
+                for m in self._varredura.finditer(dados, inicio_janela, limite):
+                    inicio = m.start()
+                    if inicio >= fim_janela:
+                        break
+                    if m.lastindex is None:
+                        continue
+                    for tipo, valor in zip(tipos, m.groups()):
+                        if valor is None or inicio < fim[tipo]:
+                            continue
+                        fim[tipo] = inicio + len(valor)
+                        valor = valor.decode('ascii')
+                        validador = self._validadores.get(tipo)
+                        if validador is not None and not validador(valor):
+                            continue
+                        # Linhas contadas só até o achado, nunca além da janela atual
+                        linha += dados[contado:inicio].count(b'\n')
+                        contado = inicio
+                        yield tipo, valor, inicio, fim[tipo], linha
+                linha += dados[contado:fim_janela].count(b'\n')
+                contado = fim_janela
+                if ao_avancar is not None:
+                    ao_avancar(fim_janela - inicio_janela)
@@ -1,9 +1,20 @@
+import hashlib
+import time
 import streamlit as st
 import pandas as pd
 import os
 import io
-from fontes.detectores import DetectorDPI
-from fontes.utilitarios import limpar_texto
+from fontes.cache_resultados import CacheResultados, CAMINHO_CACHE_PADRAO
+from fontes.carregador_dados import detectar_formato_amostra, ler_csv
+from fontes.detectores import DetectorDPI, CAMADAS_DETECCAO
+from fontes.utilitarios import limpar_serie
+
+# Textos enviados ao detector por vez e intervalos mínimos entre atualizações da página
+TAMANHO_BLOCO_GUI = 500
+INTERVALO_PROGRESSO_S = 0.25
+INTERVALO_TABELA_S = 2.0
+# Resultados guardados na sessão (os mais antigos são descartados)
+MAX_RESULTADOS_SESSAO = 5
 
 def formatar_elementos_gui(dicionario_evidencias):
     """Converte o dicionário de evidências em uma string legível para a interface."""
@@ -17,6 +28,153 @@ def formatar_elementos_gui(dicionario_evidencias):
             itens.append(f"{k}: {v}")
     return " | ".join(itens)
 
+@st.cache_data(show_spinner=False)
+def carregar_arquivo(conteudo, extensao):
+    """Converte o upload em DataFrame; em cache para não reler o arquivo a cada interação."""
+    formato = None
+    if extensao in ['xlsx', 'xls']:
+        df = pd.read_excel(io.BytesIO(conteudo))
+    elif extensao == 'parquet':
+        df = pd.read_parquet(io.BytesIO(conteudo))
+    elif extensao == 'txt':
+        # Para TXT, tratamos cada linha como um registro
+        linhas = [l.strip() for l in conteudo.decode('utf-8', errors='ignore').split('\n') if l.strip()]
+        df = pd.DataFrame(linhas, columns=['Texto'])
+    else:
+        # CSV
+        codificacao, separador = detectar_formato_amostra(conteudo[:64 * 1024])
+        df, formato = ler_csv(io.BytesIO(conteudo), codificacao, separador)
+    return df, formato
+
+def montar_tabela(df, classificacoes, elementos):
+    """Linhas já analisadas do DataFrame original com as colunas de resultado."""
+    df_final = df.iloc[:len(classificacoes)].copy()
+    df_final['Classificacao'] = classificacoes
+    df_final['Elementos_Encontrados'] = elementos
+    return df_final
+
+def exibir_tabela(espaco, df_final):
+    espaco.dataframe(
+        df_final, 
+        use_container_width=True,
+        column_config={
+            "Classificacao": st.column_config.TextColumn("Status", help="Privado se houver DPI, Público caso contrário"),
+            "Elementos_Encontrados": st.column_config.TextColumn("Evidências", width="large")
+        }
+    )
+
+def processar_em_blocos(df, coluna_texto, detector, estrito, cache):
+    """
+    LÓGICA COMPLEXA: analisa os textos em blocos de TAMANHO_BLOCO_GUI. Cada bloco vai inteiro ao
+    detector (nlp.pipe) ou ao cache; a barra de progresso e a tabela parcial só são redesenhadas
+    depois de um bloco e no máximo a cada INTERVALO_PROGRESSO_S / INTERVALO_TABELA_S, pois cada
+    atualização é uma ida e volta ao navegador.
+    
+    Returns:
+        dict: DataFrame final e os dados exibidos no resumo (guardados na sessão).
+    """
+    progresso_bar = st.progress(0.0)
+    status_text = st.empty()
+    tabela_parcial = st.empty()
+    
+    textos = limpar_serie(df[coluna_texto]).tolist()
+    total_textos = len(textos)
+    contadores_antes = dict(detector.contadores)
+    if detector.estatisticas is not None:
+        detector.estatisticas.zerar()
+    assinatura = detector.assinatura(estrito)
+    
+    classificacoes, elementos = [], []
+    ultimo_progresso = ultima_tabela = time.perf_counter()
+    for inicio in range(0, total_textos, TAMANHO_BLOCO_GUI):
+        bloco = textos[inicio:inicio + TAMANHO_BLOCO_GUI]
+        if cache is not None:
+            # Apenas textos ausentes do cache chegam ao detector
+            analises = cache.analisar_lote(bloco, assinatura, lambda t: detector.analisar_lote(t, estrito=estrito))
+        else:
+            analises = detector.analisar_lote(bloco, estrito=estrito)
+        classificacoes.extend("PRIVADO" if a['contem_dpi'] else "PUBLICO" for a in analises)
+        elementos.extend(formatar_elementos_gui(a['evidencias']) for a in analises)
+        
+        agora = time.perf_counter()
+        if agora - ultimo_progresso >= INTERVALO_PROGRESSO_S:
+            progresso_bar.progress(len(classificacoes) / total_textos)
+            status_text.text(f"Processando: {len(classificacoes)}/{total_textos}")
+            ultimo_progresso = agora
+        if agora - ultima_tabela >= INTERVALO_TABELA_S:
+            exibir_tabela(tabela_parcial, montar_tabela(df, classificacoes, elementos))
+            ultima_tabela = agora
+    
+    progresso_bar.empty()
+    status_text.empty()
+    tabela_parcial.empty()
+    return {
+        'df_final': montar_tabela(df, classificacoes, elementos),
+        'ignorados_pre_filtro': detector.contadores['ner_ignorado'] - contadores_antes['ner_ignorado'],
+        'dispensados_veredito': detector.contadores['ner_dispensado'] - contadores_antes['ner_dispensado'],
+        'estatisticas': detector.estatisticas.como_dict() if detector.estatisticas is not None else None,
+    }
+
+def chave_sessao(conteudo, coluna_texto, assinatura, estatisticas):
+    """
+    Identifica um resultado na sessão: conteúdo do arquivo, coluna analisada, configuração do
+    detector e se as estatísticas por camada foram coletadas (elas fazem parte do resultado).
+    """
+    return '|'.join([hashlib.sha256(conteudo).hexdigest(), coluna_texto, assinatura,
+                     f"estatisticas={bool(estatisticas)}"])
+
+def guardar_na_sessao(resultados_sessao, chave, resultado):
+    """Guarda o resultado na sessão, descartando os mais antigos além de MAX_RESULTADOS_SESSAO."""
+    resultados_sessao[chave] = resultado
+    while len(resultados_sessao) > MAX_RESULTADOS_SESSAO:
+        resultados_sessao.pop(next(iter(resultados_sessao)))
+
+def exibir_resultado(resultado, pre_filtro_ner, somente_veredito):
+    df_final = resultado['df_final']
+    if pre_filtro_ner:
+        st.caption(f"Pré-filtro de NER: {resultado['ignorados_pre_filtro']} de {len(df_final)} textos "
+                   f"não precisaram do modelo NLP.")
+    if somente_veredito:
+        st.caption(f"Modo veredito: {resultado['dispensados_veredito']} de {len(df_final)} textos decididos "
+                   f"pelas regex, sem o modelo NLP. As evidências exibidas são parciais.")
+    dados_estatisticas = resultado['estatisticas']
+    if dados_estatisticas is not None:
+        with st.expander("Estatísticas por Camada de Detecção"):
+            st.dataframe(
+                pd.DataFrame.from_dict(dados_estatisticas['camadas'], orient='index'),
+                use_container_width=True
+            )
+            if dados_estatisticas['achados']:
+                st.write("Achados por tipo:", dados_estatisticas['achados'])
+    
+    # --- DASHBOARD DE RESULTADOS ---
+    st.divider()
+    st.subheader("2. Resumo da Análise")
+    
+    col1, col2, col3 = st.columns(3)
+    total = len(df_final)
+    privados = int((df_final['Classificacao'] == "PRIVADO").sum())
+    publicos = total - privados
+    
+    col1.metric("Total de Pedidos", total)
+    col2.metric("Pedidos com DPI", privados, delta=f"{(privados/total*100):.1f}%" if total else None, delta_color="inverse")
+    col3.metric("Pedidos Públicos", publicos, delta=f"{(publicos/total*100):.1f}%" if total else None)
+
+    # --- TABELA INTERATIVA ---
+    st.subheader("3. Visualização Detalhada")
+    exibir_tabela(st.empty(), df_final)
+
+    # --- DOWNLOAD ---
+    st.divider()
+    csv_saida = df_final.to_csv(index=False).encode('utf-8')
+    st.download_button(
+        label="Baixar Relatório de Auditoria (CSV)",
+        data=csv_saida,
+        file_name="resultado_dpi_gui.csv",
+        mime="text/csv",
+        help="Clique para baixar o arquivo com as classificações e evidências."
+    )
+
 def main():
     st.set_page_config(page_title="Detector de DPI - Participa DF", layout="wide")
     
@@ -41,40 +199,72 @@ def main():
         help="Se marcado, qualquer dado pessoal (incluindo nomes isolados) marcará o texto como PRIVADO. Se desmarcado, nomes isolados sem outros dados podem ser considerados PUBLICO."
     )
     
+    pre_filtro_ner = st.sidebar.checkbox(
+        "Pré-filtro de NER",
+        value=False,
+        help="Envia ao modelo NLP apenas textos com palavras capitalizadas em sequência (possíveis nomes). Acelera arquivos grandes."
+    )
+    
+    camadas = st.sidebar.multiselect(
+        "Camadas de Detecção",
+        list(CAMADAS_DETECCAO),
+        default=list(CAMADAS_DETECCAO),
+        help="Camadas executadas na análise, das mais baratas (regex) para a mais cara (nomes via NLP). Sem a camada 'Nomes' o modelo NLP nem é carregado."
+    )
+    
+    somente_veredito = st.sidebar.checkbox(
+        "Somente Veredito (PRIVADO/PUBLICO)",
+        value=False,
+        help="Para no primeiro achado que já decide a classificação (ex: um CPF válido) sem rodar o modelo NLP. Mais rápido, mas as evidências listadas ficam incompletas."
+    )
+    
+    exibir_estatisticas = st.sidebar.checkbox(
+        "Estatísticas de Desempenho",
+        value=False,
+        help="Mede o tempo e o número de chamadas de cada camada de detecção (Regex, Checksum, NER, filtro de entidades)."
+    )
+    
     # Inicializa o Detector com Cache para evitar recarregamento pesado do modelo NLP
+    if not camadas:
+        st.sidebar.warning("Selecione ao menos uma camada de detecção.")
+        return
+    
     @st.cache_resource
-    def carregar_detector(tamanho):
-        return DetectorDPI(tamanho_modelo=tamanho)
+    def carregar_detector(tamanho, pre_filtro, instrumentar, camadas, veredito):
+        return DetectorDPI(tamanho_modelo=tamanho, pre_filtro_ner=pre_filtro, instrumentar=instrumentar,
+                           camadas=camadas, somente_veredito=veredito)
     
     with st.spinner("Carregando inteligência de detecção..."):
-        detector = carregar_detector(modelo)
+        detector = carregar_detector(modelo, pre_filtro_ner, exibir_estatisticas, tuple(camadas), somente_veredito)
+        # O detector carrega o modelo no primeiro uso: força a carga aqui, sob o spinner
+        detector.nlp
+    
+    usar_cache = st.sidebar.checkbox(
+        "Cache de Resultados",
+        value=True,
+        help=f"Reaproveita resultados de textos já analisados com as mesmas configurações (arquivo {CAMINHO_CACHE_PADRAO})."
+    )
+    
+    @st.cache_resource
+    def carregar_cache():
+        return CacheResultados(CAMINHO_CACHE_PADRAO)
 
     # Upload do Arquivo
     st.divider()
     st.subheader("1. Entrada de Dados")
-    arquivo_upload = st.file_uploader("Selecione o arquivo (CSV, Excel ou TXT) para análise", type=["csv", "xlsx", "xls", "txt"])
+    arquivo_upload = st.file_uploader("Selecione o arquivo (CSV, Excel, Parquet ou TXT) para análise",
+                                      type=["csv", "xlsx", "xls", "parquet", "txt"])
 
     if arquivo_upload is not None:
+        conteudo = arquivo_upload.getvalue()
         try:
-            extensao = arquivo_upload.name.split('.')[-1].lower()
-            
-            if extensao in ['xlsx', 'xls']:
-                df = pd.read_excel(arquivo_upload)
-            elif extensao == 'txt':
-                content = arquivo_upload.getvalue().decode('utf-8', errors='ignore')
-                # Para TXT, tratamos cada linha como um registro
-                linhas = [l.strip() for l in content.split('\n') if l.strip()]
-                df = pd.DataFrame(linhas, columns=['Texto'])
-            else:
-                # CSV
-                content = arquivo_upload.getvalue()
-                try:
-                    df = pd.read_csv(io.BytesIO(content), sep=None, engine='python', encoding='utf-8')
-                except UnicodeDecodeError:
-                    df = pd.read_csv(io.BytesIO(content), sep=None, engine='python', encoding='iso-8859-1')
+            df, formato = carregar_arquivo(conteudo, arquivo_upload.name.split('.')[-1].lower())
         except Exception as e:
             st.error(f"Erro ao carregar o arquivo: {e}")
             return
+        if formato is not None:
+            st.caption(f"Formato detectado: codificação {formato['codificacao']}, "
+                       f"separador {formato['separador']!r}, leitor {formato['motor']}")
 
         st.info(f"Arquivo carregado: **{len(df)}** registros encontrados.")
         
@@ -83,71 +273,22 @@ def main():
         coluna_padrao = next((c for c in ['Texto Mascarado', 'Texto', 'texto', 'TEXTO'] if c in colunas), colunas[0])
         coluna_texto = st.selectbox("Selecione a coluna que contém o texto para análise:", colunas, index=colunas.index(coluna_padrao))
 
+        # Resultados ficam na sessão, por conteúdo do arquivo + configurações: sobrevivem às
+        # reexecuções do Streamlit (ex: baixar o relatório) sem refazer a análise
+        resultados_sessao = st.session_state.setdefault('resultados_analise', {})
+        chave = chave_sessao(conteudo, coluna_texto, detector.assinatura(estrito), exibir_estatisticas)
+
         if st.button("Iniciar Análise de Privacidade", type="primary"):
-            resultados = []
-            progresso_bar = st.progress(0)
-            status_text = st.empty()
-            
-            for i, (idx, linha) in enumerate(df.iterrows()):
-                texto = str(linha.get(coluna_texto, ''))
-                texto_limpo = limpar_texto(texto)
-                
-                # Executa a detecção
-                analise = detector.analisar(texto_limpo, estrito=estrito)
-                
-                # Lógica de Classificação
-                classificacao = "PRIVADO" if analise['contem_dpi'] else "PUBLICO"
-                
-                # Formata evidências usando a lógica do projeto
-                evidencias = formatar_elementos_gui(analise['evidencias'])
-                
-                nova_linha = linha.to_dict()
-                nova_linha['Classificacao'] = classificacao
-                nova_linha['Elementos_Encontrados'] = evidencias
-                resultados.append(nova_linha)
-                
-                # Atualiza progresso
-                percentual = (i + 1) / len(df)
-                progresso_bar.progress(percentual)
-                status_text.text(f"Processando: {i+1}/{len(df)}")
-
-            status_text.success("Análise concluída com sucesso!")
-            df_final = pd.DataFrame(resultados)
-            
-            # --- DASHBOARD DE RESULTADOS ---
-            st.divider()
-            st.subheader("2. Resumo da Análise")
-            
-            col1, col2, col3 = st.columns(3)
-            total = len(df_final)
-            privados = len(df_final[df_final['Classificacao'] == "PRIVADO"])
-            publicos = total - privados
-            
-            col1.metric("Total de Pedidos", total)
-            col2.metric("Pedidos com DPI", privados, delta=f"{(privados/total*100):.1f}%", delta_color="inverse")
-            col3.metric("Pedidos Públicos", publicos, delta=f"{(publicos/total*100):.1f}%")
-
-            # --- TABELA INTERATIVA ---
-            st.subheader("3. Visualização Detalhada")
-            st.dataframe(
-                df_final, 
-                use_container_width=True,
-                column_config={
-                    "Classificacao": st.column_config.TextColumn("Status", help="Privado se houver DPI, Público caso contrário"),
-                    "Elementos_Encontrados": st.column_config.TextColumn("Evidências", width="large")
-                }
-            )
+            if chave in resultados_sessao:
+                st.caption("Resultado reaproveitado da sessão (mesmo arquivo e configurações).")
+            else:
+                resultado = processar_em_blocos(df, coluna_texto, detector, estrito,
+                                                carregar_cache() if usar_cache else None)
+                guardar_na_sessao(resultados_sessao, chave, resultado)
+                st.success("Análise concluída com sucesso!")
 
-            # --- DOWNLOAD ---
-            st.divider()
-            csv_saida = df_final.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label="Baixar Relatório de Auditoria (CSV)",
-                data=csv_saida,
-                file_name="resultado_dpi_gui.csv",
-                mime="text/csv",
-                help="Clique para baixar o arquivo com as classificações e evidências."
-            )
+        if chave in resultados_sessao:
+            exibir_resultado(resultados_sessao[chave], pre_filtro_ner, somente_veredito)
 
 if __name__ == "__main__":
     main()
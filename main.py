@@ -1,11 +1,14 @@
 import sys
 import os
 import argparse
-import pandas as pd
-from tqdm import tqdm
-from fontes.carregador_dados import carregar_dados, salvar_dados
-from fontes.detectores import DetectorDPI
-from fontes.utilitarios import limpar_texto
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+# Pandas, tqdm e o carregador de dados são importados só quando usados: --gui e --servidor
+# não precisam deles, e o Spacy só é carregado na primeira análise (DetectorDPI.nlp)
+from fontes.cache_resultados import CacheResultados, CAMINHO_CACHE_PADRAO
+from fontes.detectores import DetectorDPI, TIPOS_EVIDENCIA, CAMADAS_DETECCAO
+from fontes.estatisticas import EstatisticasDeteccao
+from fontes.utilitarios import limpar_serie, impressao_digital, mascarar_texto
 
 def formatar_elementos(dicionario_evidencias):
     """
@@ -22,20 +25,258 @@ def formatar_elementos(dicionario_evidencias):
             itens.append(f"{k}: {v}")
     return " | ".join(itens)
 
+def interpretar_elementos(elementos):
+    """Operação inversa de `formatar_elementos` (usada para relatórios anteriores em CSV)."""
+    evidencias = {}
+    for item in elementos.split(" | ") if elementos else []:
+        tipo, _, valores = item.partition(": ")
+        evidencias[tipo] = valores.split(", ") if valores else []
+    return evidencias
+
 import subprocess
 
+# Detector próprio de cada processo do pool (carregado uma única vez no initializer)
+_detector_worker = None
+
+def _inicializar_worker(opcoes_detector):
+    global _detector_worker
+    _detector_worker = DetectorDPI(**opcoes_detector)
+
+def _analisar_bloco_worker(argumentos_bloco):
+    """
+    Analisa um bloco no processo do pool e devolve também a variação dos contadores e as
+    estatísticas do bloco (zeradas em seguida), para agregação no processo principal.
+    """
+    textos, estrito = argumentos_bloco
+    antes = dict(_detector_worker.contadores)
+    analises = _detector_worker.analisar_lote(textos, estrito=estrito)
+    contadores = {k: v - antes.get(k, 0) for k, v in _detector_worker.contadores.items()}
+    estatisticas = None
+    if _detector_worker.estatisticas is not None:
+        estatisticas = _detector_worker.estatisticas.como_dict()
+        _detector_worker.estatisticas.zerar()
+    return analises, contadores, estatisticas
+
+def _assinatura_worker(estrito):
+    return _detector_worker.assinatura(estrito)
+
+def analisar_em_paralelo(executor, textos, estrito, tamanho_bloco, barra, contadores, estatisticas):
+    """
+    LÓGICA COMPLEXA: Divide os textos em blocos contíguos e os distribui no pool de processos.
+    Cada processo carrega o modelo Spacy uma única vez (initializer) e o `executor.map`
+    devolve os blocos na ordem de envio, preservando a ordem original das linhas.
+    """
+    blocos = [textos[i:i + tamanho_bloco] for i in range(0, len(textos), tamanho_bloco)]
+    analises = []
+    tarefas = executor.map(_analisar_bloco_worker, [(bloco, estrito) for bloco in blocos])
+    for resultado_bloco, contadores_bloco, estatisticas_bloco in tarefas:
+        analises.extend(resultado_bloco)
+        contadores.update(contadores_bloco)
+        estatisticas.mesclar(estatisticas_bloco)
+        barra.update(len(resultado_bloco))
+    return analises
+
+def _acompanhar(textos, barra):
+    for texto in textos:
+        yield texto
+        barra.update(1)
+
+def encontrar_coluna_texto(colunas):
+    """Tenta encontrar a coluna de texto entre os nomes usados nas exportações do e-SIC."""
+    colunas_possiveis = ['Texto Mascarado', 'Texto', 'texto', 'TEXTO']
+    for col in colunas_possiveis:
+        if col in colunas:
+            return col
+    return None
+
+def resumir_analise(analise):
+    """Colunas pedidas: Classificação (PRIVADO/PUBLICO) e Elementos_Encontrados (mais as evidências brutas)."""
+    evidencias = analise['evidencias']
+    return ("PRIVADO" if analise['contem_dpi'] else "PUBLICO"), formatar_elementos(evidencias), evidencias
+
+def montar_resultado(df, resumos, estruturado=False, textos_mascarados=None, assinatura=None):
+    """
+    Mantém colunas originais e adiciona as novas para o relatório de auditoria.
+    Com `estruturado=True` (saídas Parquet/Arrow), acrescenta também uma coluna de lista
+    por tipo de evidência (ex: Elementos_CPF), que dispensa interpretar Elementos_Encontrados.
+    Com `textos_mascarados`, acrescenta a coluna COLUNA_MASCARADA (texto pronto para publicação).
+    Com `assinatura`, acrescenta a coluna COLUNA_ASSINATURA (regras e opções que geraram o
+    resultado), usada por --base-anterior para não reaproveitar resultados de outra configuração.
+    """
+    import pandas as pd
+    
+    # Remove coluna antiga se existir para manter o CSV limpo
+    df_final = df.drop(columns=['Contem_DPI'], errors='ignore')
+    
+    df_final['Classificacao'] = [classificacao for classificacao, _, _ in resumos]
+    df_final['Elementos_Encontrados'] = [elementos for _, elementos, _ in resumos]
+    if estruturado:
+        for tipo in TIPOS_EVIDENCIA:
+            # Series explícita: uma lista de listas seria interpretada como matriz pelo pandas
+            df_final[f'Elementos_{tipo}'] = pd.Series([evidencias.get(tipo, []) for _, _, evidencias in resumos],
+                                                      index=df_final.index, dtype=object)
+    if textos_mascarados is not None:
+        df_final[COLUNA_MASCARADA] = textos_mascarados
+    if assinatura is not None:
+        df_final[COLUNA_ASSINATURA] = assinatura
+    return df_final
+
+COLUNA_ID = 'ID'
+COLUNA_MASCARADA = 'Texto_Anonimizado'
+COLUNA_ASSINATURA = 'Assinatura_Detector'
+
+def carregar_base_anterior(caminho):
+    """
+    LÓGICA COMPLEXA: Lê um relatório anterior (ex: resultado_dpi.csv) e indexa, por ID, a impressão
+    digital do texto já limpo junto com a Classificacao/Elementos_Encontrados gravados, o texto
+    mascarado (quando a base foi gerada com --mascarar) e a assinatura do detector que os gerou.
+    Linhas da nova entrada com o mesmo ID, o mesmo texto e a mesma assinatura (mesma versão das
+    regras e mesmas opções de análise) reaproveitam esse resultado sem nova análise; bases sem a
+    coluna COLUNA_ASSINATURA (geradas por versões antigas) são sempre recalculadas.
+    Apenas essas informações ficam em memória, não o DataFrame da base.
+    """
+    from fontes.carregador_dados import carregar_dados
+    
+    df_base = carregar_dados(caminho)
+    if df_base is None:
+        return None
+    
+    coluna_texto = encontrar_coluna_texto(df_base.columns)
+    faltando = [c for c in [COLUNA_ID, 'Classificacao', 'Elementos_Encontrados'] if c not in df_base.columns]
+    if coluna_texto is None or faltando:
+        print(f"Erro: Base anterior sem as colunas necessárias ({', '.join(faltando) or 'coluna de texto'}).")
+        return None
+    
+    if COLUNA_MASCARADA in df_base.columns:
+        mascarados = df_base[COLUNA_MASCARADA].fillna('')
+    else:
+        mascarados = [None] * len(df_base)
+    if COLUNA_ASSINATURA in df_base.columns:
+        assinaturas = df_base[COLUNA_ASSINATURA].fillna('')
+    else:
+        assinaturas = [None] * len(df_base)
+    
+    return {
+        id_linha: (impressao_digital(texto), classificacao, elementos, mascarado, assinatura)
+        for id_linha, texto, classificacao, elementos, mascarado, assinatura in zip(
+            df_base[COLUNA_ID].astype(str), limpar_serie(df_base[coluna_texto]),
+            df_base['Classificacao'], df_base['Elementos_Encontrados'].fillna(''), mascarados, assinaturas
+        )
+    }
+
+def iniciar_servico(argumentos):
+    """Carrega o detector uma vez e atende requisições HTTP até Ctrl+C (ver fontes/servico.py)."""
+    from fontes.servico import ServicoDPI, criar_servidor
+    
+    print("\n--- Iniciando Serviço HTTP de Detecção de DPI ---")
+    detector = DetectorDPI(pre_filtro_ner=argumentos.pre_filtro_ner, instrumentar=argumentos.estatisticas,
+                           arquivos_exclusao=argumentos.dicionario_exclusao, somente_ner=argumentos.somente_ner,
+                           camadas=argumentos.camadas, somente_veredito=argumentos.somente_veredito)
+    servico = ServicoDPI(detector)
+    servidor = criar_servidor(servico, argumentos.host, argumentos.porta)
+    print(f"Atendendo em http://{argumentos.host}:{servidor.server_address[1]} "
+          f"(POST /analisar, POST /analisar/lote, GET /saude, GET /metricas)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\nEncerrando serviço...")
+    finally:
+        servidor.server_close()
+        servico.parar()
+
+def varrer_arquivo_texto(argumentos):
+    """
+    Varre um arquivo texto/log de qualquer tamanho (memória mapeada, em janelas sobrepostas) com as
+    camadas de regex + checksum e grava cada achado em CSV, com posição em bytes e número da linha.
+    """
+    import csv
+    from tqdm import tqdm
+    from fontes.varredura_arquivo import VarredorArquivo
+    
+    if not os.path.exists(argumentos.entrada):
+        print(f"Erro: Arquivo não encontrado: {argumentos.entrada}")
+        sys.exit(1)
+    try:
+        varredor = VarredorArquivo(argumentos.camadas)
+    except ValueError as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+    
+    print(f"\n--- Varredura de Arquivo ({', '.join(c.tipo for c in varredor.camadas)}) ---")
+    contagem = Counter()
+    with open(argumentos.saida, 'w', newline='', encoding='utf-8') as saida, \
+            tqdm(total=os.path.getsize(argumentos.entrada), unit='B', unit_scale=True, desc="Varrendo") as barra:
+        escritor = csv.writer(saida)
+        escritor.writerow(['Tipo', 'Valor', 'Byte_Inicio', 'Byte_Fim', 'Linha'])
+        for achado in varredor.varrer(argumentos.entrada, barra.update):
+            escritor.writerow(achado)
+            contagem[achado[0]] += 1
+    
+    print("\n--- Achados por Tipo ---")
+    for tipo, quantidade in contagem.most_common():
+        print(f"{tipo}: {quantidade}")
+    print(f"\nArquivo salvo com sucesso em: {argumentos.saida} ({sum(contagem.values())} achados)")
+
 def principal():
     """
     Função principal de execução do pipeline de detecção de DPI com relatório detalhado.
     Implementa a lógica de auditoria solicitada (Classificação + Justificativa).
     """
     parser = argparse.ArgumentParser(description='Hackathon Participa DF - Detector de DPI Avançado')
-    parser.add_argument('entrada', nargs='?', help='Caminho do arquivo CSV de entrada (opcional se usar --gui)')
-    parser.add_argument('--saida', default='resultado_analise_completa.csv', help='Caminho do arquivo de saída')
+    parser.add_argument('entrada', nargs='?',
+                        help='Arquivo de entrada: CSV, Parquet (.parquet) ou Arrow (.arrow/.feather) (opcional se usar --gui)')
+    parser.add_argument('--saida', default='resultado_analise_completa.csv',
+                        help='Arquivo de saída; .parquet/.arrow/.feather gravam também colunas de lista por tipo de evidência')
     parser.add_argument('--gui', action='store_true', help='Inicia a interface gráfica (Streamlit)')
     parser.add_argument('--filtro-leve', action='store_true', help='Usa filtragem menos estrita (ignora nomes isolados)')
+    parser.add_argument('--workers', type=int, default=1, help='Número de processos paralelos para a análise (padrão: 1)')
+    parser.add_argument('--tamanho-bloco', type=int, default=1000, help='Quantidade de registros por bloco de processamento')
+    parser.add_argument('--pre-filtro-ner', action='store_true', help='Envia ao NER apenas textos com palavras capitalizadas em sequência')
+    parser.add_argument('--cache', nargs='?', const=CAMINHO_CACHE_PADRAO, default=None, metavar='ARQUIVO',
+                        help=f'Reaproveita resultados de textos já analisados (SQLite, padrão: {CAMINHO_CACHE_PADRAO})')
+    parser.add_argument('--cache-max-entradas', type=int, default=1_000_000, help='Tamanho máximo do cache de resultados')
+    parser.add_argument('--base-anterior', metavar='ARQUIVO',
+                        help='Relatório anterior (ex: resultado_dpi.csv): reanalisa apenas linhas novas ou com texto alterado '
+                             '(mesmo ID, mesmo texto e mesma assinatura do detector reaproveitam o resultado)')
+    parser.add_argument('--estatisticas', action='store_true',
+                        help='Mede tempo e chamadas por camada de detecção e exibe ao final')
+    parser.add_argument('--streaming', action='store_true', help='Lê e grava o arquivo em blocos, com uso de memória limitado')
+    parser.add_argument('--dicionario-exclusao', nargs='+', metavar='ARQUIVO',
+                        help='Arquivos com termos (um por linha) que descartam nomes detectados; '
+                             'substituem o dicionário padrão data/entidades_exclusao_df.txt')
+    
+    parser.add_argument('--somente-ner', action='store_true',
+                        help='Carrega do modelo Spacy apenas os componentes usados pelo NER (carga mais rápida)')
+    parser.add_argument('--camadas', nargs='+', choices=list(CAMADAS_DETECCAO), metavar='CAMADA',
+                        help=f"Camadas de detecção ligadas (padrão: todas): {', '.join(CAMADAS_DETECCAO)}")
+    parser.add_argument('--somente-veredito', action='store_true',
+                        help='Só a classificação PRIVADO/PUBLICO: para no primeiro achado decisivo (ex: CPF válido) '
+                             'sem rodar o NER; Elementos_Encontrados fica parcial')
+    parser.add_argument('--mascarar', action='store_true',
+                        help=f"Grava a coluna '{COLUNA_MASCARADA}': o texto com cada dado pessoal trocado pelo tipo "
+                             f"(ex: [CPF]), usando as posições da própria análise")
+    parser.add_argument('--varrer-arquivo', action='store_true',
+                        help='Trata a entrada como texto/log bruto de qualquer tamanho: varre o arquivo mapeado em memória '
+                             '(CPF, CNPJ, Email e Telefone, ou --camadas) e grava cada achado com posição em bytes e linha')
+    parser.add_argument('--servidor', action='store_true',
+                        help='Inicia o serviço HTTP de análise (modelo carregado uma única vez)')
+    parser.add_argument('--host', default='127.0.0.1', help='Endereço de escuta do serviço HTTP')
+    parser.add_argument('--porta', type=int, default=8000, help='Porta do serviço HTTP (padrão: 8000)')
     
     argumentos = parser.parse_args()
+    if argumentos.mascarar and argumentos.somente_veredito:
+        # O modo veredito para no primeiro achado: as posições (e o mascaramento) ficariam parciais
+        parser.error("--mascarar não pode ser combinado com --somente-veredito")
+    if argumentos.varrer_arquivo and not argumentos.entrada:
+        parser.error("--varrer-arquivo exige o arquivo de entrada")
+
+    if argumentos.servidor:
+        iniciar_servico(argumentos)
+        return
+    
+    if argumentos.varrer_arquivo:
+        varrer_arquivo_texto(argumentos)
+        return
 
     # Se --gui for passado ou se não houver argumentos de entrada, inicia a GUI
     if argumentos.gui or not argumentos.entrada:
@@ -46,64 +287,181 @@ def principal():
             print("Erro: Streamlit não encontrado. Instale com 'pip install streamlit'.")
         return
     
+    import pandas as pd
+    from tqdm import tqdm
+    from fontes.carregador_dados import (carregar_dados, carregar_dados_em_blocos, salvar_dados,
+                                         formato_arquivo, GravadorColunar)
+    
     print("\n--- Iniciando Análise Otimizada (Junie AI) ---")
     print(f"Lendo dados de: {argumentos.entrada}")
     
-    df = carregar_dados(argumentos.entrada)
+    workers = max(1, argumentos.workers)
     
-    if df is None:
+    # LÓGICA COMPLEXA: no modo streaming o arquivo é lido em blocos (um bloco por worker a
+    # cada leitura) e cada bloco analisado é anexado à saída imediatamente, de modo que a
+    # memória fica limitada ao tamanho do bloco. Sem streaming, o arquivo inteiro forma um bloco.
+    if argumentos.streaming:
+        blocos = carregar_dados_em_blocos(argumentos.entrada, argumentos.tamanho_bloco * workers)
+        total_linhas = None
+    else:
+        df = carregar_dados(argumentos.entrada)
+        blocos = [df] if df is not None else None
+        total_linhas = len(df) if df is not None else None
+    
+    if blocos is None:
         sys.exit(1)
-        
-    # Tenta encontrar a coluna de texto
+    
+    base_anterior = None
+    if argumentos.base_anterior:
+        print(f"Lendo base anterior de: {argumentos.base_anterior}")
+        base_anterior = carregar_base_anterior(argumentos.base_anterior)
+        if base_anterior is None:
+            sys.exit(1)
+    
+    estrito = not argumentos.filtro_leve
+    opcoes_detector = {
+        'pre_filtro_ner': argumentos.pre_filtro_ner,
+        'instrumentar': argumentos.estatisticas,
+        'arquivos_exclusao': argumentos.dicionario_exclusao,
+        'somente_ner': argumentos.somente_ner,
+        'camadas': argumentos.camadas,
+        'somente_veredito': argumentos.somente_veredito,
+    }
+    executor = None
+    detector = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_worker,
+                                       initargs=(opcoes_detector,))
+    else:
+        detector = DetectorDPI(**opcoes_detector)
+    
+    # Saídas colunares são gravadas bloco a bloco por um único escritor (Parquet não aceita "append")
+    gravador = None
+    if formato_arquivo(argumentos.saida) != 'csv':
+        try:
+            gravador = GravadorColunar(argumentos.saida)
+        except ImportError as e:
+            print(f"Erro: {e}")
+            sys.exit(1)
+    
+    # Gravada na saída e usada como chave do cache; sem detector no processo principal, vem de um dos workers
+    assinatura = executor.submit(_assinatura_worker, estrito).result() if executor else detector.assinatura(estrito)
+    cache = None
+    if argumentos.cache:
+        cache = CacheResultados(argumentos.cache, argumentos.cache_max_entradas)
+    
     coluna_texto = None
-    colunas_possiveis = ['Texto Mascarado', 'Texto', 'texto', 'TEXTO']
-    for col in colunas_possiveis:
-        if col in df.columns:
-            coluna_texto = col
-            break
+    contagem = Counter()
+    contadores_ner = Counter()
+    estatisticas = EstatisticasDeteccao()
+    linhas_gravadas = 0
+    reaproveitadas = 0
+    
+    try:
+        with tqdm(total=total_linhas, desc=f"Analisando ({workers} processos)" if executor else "Analisando") as barra:
             
-    if coluna_texto is None:
-        print(f"Erro: Coluna de texto não encontrada. Colunas disponíveis: {df.columns.tolist()}")
-        sys.exit(1)
-        
-    detector = DetectorDPI()
-    
-    print(f"Processando textos da coluna '{coluna_texto}' e gerando justificativas...")
-    
-    resultados = []
-    
-    for idx, linha in tqdm(df.iterrows(), total=len(df), desc="Analisando"):
-        texto_original = str(linha.get(coluna_texto, ''))
-        texto_limpo = limpar_texto(texto_original)
-        
-        analise = detector.analisar(texto_limpo, estrito=not argumentos.filtro_leve)
-        
-        # Colunas pedidas: Classificação (PRIVADO/PUBLICO) e Elementos_Encontrados
-        classificacao = "PRIVADO" if analise['contem_dpi'] else "PUBLICO"
-        justificativa = formatar_elementos(analise['evidencias'])
-        
-        # Mantém colunas originais e adiciona as novas para o relatório de auditoria
-        nova_linha = linha.to_dict()
-        nova_linha['Classificacao'] = classificacao
-        nova_linha['Elementos_Encontrados'] = justificativa
-        
-        # Remove coluna antiga se existir para manter o CSV limpo
-        if 'Contem_DPI' in nova_linha:
-            del nova_linha['Contem_DPI']
+            def analisar_textos(textos):
+                if executor:
+                    return analisar_em_paralelo(executor, textos, estrito, argumentos.tamanho_bloco, barra,
+                                                contadores_ner, estatisticas)
+                # O detector envia o bloco inteiro para o NER (nlp.pipe)
+                return detector.analisar_lote(_acompanhar(textos, barra), estrito=estrito)
             
-        resultados.append(nova_linha)
-
-    df_final = pd.DataFrame(resultados)
+            def analisar_com_cache(textos):
+                if not cache:
+                    return analisar_textos(textos)
+                # Só os textos ausentes do cache chegam ao detector; os demais avançam a barra aqui
+                faltas_antes = cache.faltas
+                analises = cache.analisar_lote(textos, assinatura, analisar_textos)
+                barra.update(len(textos) - (cache.faltas - faltas_antes))
+                return analises
+            
+            for df in blocos:
+                if coluna_texto is None:
+                    coluna_texto = encontrar_coluna_texto(df.columns)
+                    if coluna_texto is None:
+                        print(f"Erro: Coluna de texto não encontrada. Colunas disponíveis: {df.columns.tolist()}")
+                        sys.exit(1)
+                    if base_anterior is not None and COLUNA_ID not in df.columns:
+                        print(f"Aviso: coluna '{COLUNA_ID}' ausente na entrada; a base anterior será ignorada.")
+                        base_anterior = None
+                    print(f"Processando textos da coluna '{coluna_texto}' e gerando justificativas...")
+                
+                # Limpeza vetorizada da coluna; daqui em diante só listas simples (sem iterrows)
+                textos = limpar_serie(df[coluna_texto]).tolist()
+                # O texto mascarado sai das posições da própria análise, sem nova busca no texto
+                mascarados = [None] * len(textos) if argumentos.mascarar else None
+                
+                if base_anterior is not None:
+                    resumos = [None] * len(textos)
+                    pendentes = []
+                    for i, (id_linha, texto) in enumerate(zip(df[COLUNA_ID].astype(str).tolist(), textos)):
+                        anterior = base_anterior.get(id_linha)
+                        # Com --mascarar, só são reaproveitadas linhas cuja base já traz o texto mascarado
+                        if anterior is not None and anterior[0] == impressao_digital(texto) and \
+                                anterior[4] == assinatura and (mascarados is None or anterior[3] is not None):
+                            resumos[i] = (anterior[1], anterior[2], interpretar_elementos(anterior[2]))
+                            if mascarados is not None:
+                                mascarados[i] = anterior[3]
+                        else:
+                            pendentes.append(i)
+                    
+                    analises = analisar_com_cache([textos[i] for i in pendentes])
+                    for i, analise in zip(pendentes, analises):
+                        resumos[i] = resumir_analise(analise)
+                        if mascarados is not None:
+                            mascarados[i] = mascarar_texto(textos[i], analise.get('posicoes', {}))
+                    reaproveitadas += len(textos) - len(pendentes)
+                    barra.update(len(textos) - len(pendentes))
+                else:
+                    analises = analisar_com_cache(textos)
+                    resumos = [resumir_analise(a) for a in analises]
+                    if mascarados is not None:
+                        mascarados = [mascarar_texto(t, a.get('posicoes', {})) for t, a in zip(textos, analises)]
+                
+                df_final = montar_resultado(df, resumos, estruturado=gravador is not None,
+                                            textos_mascarados=mascarados, assinatura=assinatura)
+                
+                if gravador:
+                    salvo = gravador.gravar(df_final)
+                else:
+                    salvo = salvar_dados(df_final, argumentos.saida, anexar=linhas_gravadas > 0)
+                if not salvo:
+                    print("Falha ao salvar os resultados.")
+                    sys.exit(1)
+                linhas_gravadas += len(df_final)
+                contagem.update(df_final['Classificacao'])
+    finally:
+        if executor:
+            executor.shutdown()
+        if cache:
+            cache.fechar()
+        if gravador:
+            gravador.fechar()
     
-    print(f"Salvando resultados em: {argumentos.saida}")
-    if salvar_dados(df_final, argumentos.saida):
-        print("\n--- Relatório Gerado ---")
-        if 'Classificacao' in df_final.columns:
-            print(df_final['Classificacao'].value_counts())
-        print(f"\nArquivo salvo com sucesso em: {argumentos.saida}")
-    else:
-        print("Falha ao salvar os resultados.")
+    if detector:
+        contadores_ner.update(detector.contadores)
+        estatisticas.mesclar(detector.estatisticas)
+    
+    if coluna_texto is None:
+        print("Erro: Nenhum registro encontrado no arquivo de entrada.")
         sys.exit(1)
+    
+    print("\n--- Relatório Gerado ---")
+    print(pd.Series(contagem, name='Classificacao').sort_values(ascending=False).to_string())
+    if argumentos.pre_filtro_ner:
+        print(f"NER executado em {contadores_ner['ner_executado']} textos; "
+              f"{contadores_ner['ner_ignorado']} ignorados pelo pré-filtro.")
+    if argumentos.somente_veredito:
+        print(f"Modo veredito: {contadores_ner['ner_dispensado']} textos decididos pelas regex, sem NER.")
+    if argumentos.estatisticas:
+        print("\n--- Estatísticas por Camada ---")
+        print(estatisticas.formatar())
+    if argumentos.base_anterior:
+        print(f"Base anterior: {reaproveitadas} linhas reaproveitadas, {linhas_gravadas - reaproveitadas} recalculadas.")
+    if cache:
+        print(f"Cache de resultados: {cache.acertos} reaproveitados, {cache.faltas} analisados.")
+    print(f"\nArquivo salvo com sucesso em: {argumentos.saida} ({linhas_gravadas} registros)")
 
 if __name__ == "__main__":
     principal()
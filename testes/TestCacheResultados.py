@@ -0,0 +1,63 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Adiciona o diretório raiz ao path para encontrar o módulo 'fontes'
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fontes.cache_resultados import CacheResultados
+from fontes.detectores import DetectorDPI
+
+
+class TestCacheResultados(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.detector = DetectorDPI()
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.diretorio.name, 'cache.sqlite')
+        self.chamadas = []
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def _analisar(self, textos):
+        self.chamadas.append(list(textos))
+        return self.detector.analisar_lote(textos)
+
+    def test_reaproveita_textos_entre_execucoes(self):
+        """Textos repetidos e reexecuções não devem passar novamente pelo detector."""
+        textos = ["O CPF do cliente é 123.456.789-09.", "", "Texto sem dados.", "O CPF do cliente é 123.456.789-09."]
+        assinatura = self.detector.assinatura(True)
+
+        cache = CacheResultados(self.caminho)
+        primeira = cache.analisar_lote(textos, assinatura, self._analisar)
+        cache.fechar()
+        self.assertEqual(self.chamadas, [["O CPF do cliente é 123.456.789-09.", "Texto sem dados."]])
+
+        cache = CacheResultados(self.caminho)
+        segunda = cache.analisar_lote(textos, assinatura, self._analisar)
+        self.assertEqual(len(self.chamadas), 1, "Reexecução não deveria chamar o detector")
+        self.assertEqual(cache.acertos, 3)
+        self.assertEqual(primeira, segunda)
+        self.assertEqual(segunda, self.detector.analisar_lote(textos))
+
+        # Outra configuração (assinatura) não reaproveita os resultados
+        cache.analisar_lote(textos, self.detector.assinatura(False), self._analisar)
+        self.assertEqual(len(self.chamadas), 2)
+        cache.fechar()
+
+    def test_limite_de_entradas(self):
+        """O cache remove as entradas menos acessadas ao passar do limite."""
+        cache = CacheResultados(self.caminho, max_entradas=2)
+        assinatura = self.detector.assinatura(True)
+        cache.analisar_lote(["texto um", "texto dois"], assinatura, self._analisar)
+        cache.analisar_lote(["texto três"], assinatura, self._analisar)
+        self.assertEqual(cache._conexao.execute('SELECT COUNT(*) FROM resultados').fetchone()[0], 2)
+        cache.fechar()
+
+
+if __name__ == '__main__':
+    unittest.main()
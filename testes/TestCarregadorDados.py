@@ -0,0 +1,156 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+# Adiciona o diretório raiz ao path para encontrar o módulo 'fontes'
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+
+import fontes.carregador_dados as carregador
+from fontes.carregador_dados import (carregar_dados, carregar_dados_em_blocos, detectar_formato,
+                                     GravadorColunar)
+from fontes.detectores import DetectorDPI, TIPOS_EVIDENCIA
+
+TEXTOS = [
+    "Solicito, por gentileza, cópia do processo.",
+    "Meu CPF é 123.456.789-09, e-mail joao.silva@email.com.br.",
+    'Solicito, "cópia integral", do processo.',
+    "Prezados,\nsolicito os dados.\nAtenciosamente,\nMaria",
+    "Sem dados pessoais",
+]
+
+
+class TestCarregadorDados(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def _gravar_csv(self, nome, linhas, final=b''):
+        caminho = os.path.join(self.diretorio.name, nome)
+        with open(caminho, 'wb') as arquivo:
+            arquivo.write('ID;Texto Mascarado\n'.encode('utf-8'))
+            for i, texto in enumerate(linhas, 1):
+                arquivo.write(f'{i};"{texto.replace(chr(34), chr(34) * 2)}"\n'.encode('utf-8'))
+            arquivo.write(final)
+        return caminho
+
+    def _motores(self):
+        """Motores rápidos instalados (cada teste roda com todos, um por vez)."""
+        return [[motor] for motor in carregador._motores_csv()]
+
+    def test_separador_vem_do_cabecalho(self):
+        """Vírgulas e quebras de linha no texto livre entre aspas não podem vencer o ';' do cabeçalho."""
+        caminho = self._gravar_csv('esic.csv', TEXTOS * 60)
+        self.assertEqual(detectar_formato(caminho), ('utf-8', ';'))
+        for motores in self._motores():
+            with self.subTest(motores=motores), mock.patch.object(carregador, '_motores_csv', return_value=motores):
+                df = carregar_dados(caminho)
+                self.assertEqual(df.shape, (300, 2))
+                self.assertEqual(list(df.columns), ['ID', 'Texto Mascarado'])
+                self.assertEqual(df['Texto Mascarado'].tolist(), TEXTOS * 60)
+
+    def test_byte_invalido_depois_da_amostra(self):
+        """Um byte Latin-1 após a amostra faz a releitura em ISO-8859-1 (inclusive no pyarrow)."""
+        final = '9999;"Jo\xe3o Silva"\n'.encode('iso-8859-1')
+        caminho = self._gravar_csv('tardio.csv', ["Texto sem acentos, apenas ASCII."] * 3000, final)
+        self.assertGreater(os.path.getsize(caminho), 64 * 1024)
+        self.assertEqual(detectar_formato(caminho)[0], 'utf-8')
+        for motores in self._motores():
+            with self.subTest(motores=motores), mock.patch.object(carregador, '_motores_csv', return_value=motores):
+                df = carregar_dados(caminho)
+                self.assertEqual(df.shape, (3001, 2))
+                self.assertEqual(df['Texto Mascarado'].iloc[-1], 'João Silva')
+                self.assertTrue(all(isinstance(t, str) for t in df['Texto Mascarado']))
+
+    def test_arquivo_malformado_nao_descarta_linhas_em_silencio(self):
+        """Uma linha com coluna a mais faz os motores rápidos falharem e leva ao parser Python,
+        que mantém as demais linhas e descarta a malformada com aviso."""
+        caminho = os.path.join(self.diretorio.name, 'malformado.csv')
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            arquivo.write('ID;Texto\n1;abc\n2;def;extra\n3;ghi\n4;jkl\n')
+        codificacao, separador = detectar_formato(caminho)
+        with self.assertWarnsRegex(pd.errors.ParserWarning, 'Skipping line 3'):
+            df, formato = carregador.ler_csv(caminho, codificacao, separador)
+        self.assertEqual(formato['motor'], 'python')
+        self.assertEqual(list(df.columns), ['ID', 'Texto'])
+        self.assertEqual(df['ID'].tolist(), [1, 3, 4])
+        self.assertEqual(df['Texto'].tolist(), ['abc', 'ghi', 'jkl'])
+        with self.assertWarns(pd.errors.ParserWarning):
+            self.assertEqual(carregar_dados(caminho)['ID'].tolist(), [1, 3, 4])
+
+    def test_streaming_equivale_a_leitura_completa(self):
+        """Os blocos do --streaming somam exatamente o DataFrame de `carregar_dados`."""
+        final = '9999;"Atenciosamente, Jo\xe3o Silva"\n'.encode('iso-8859-1')
+        arquivos = [self._gravar_csv('esic.csv', TEXTOS * 60),
+                    self._gravar_csv('tardio.csv', ["Solicito, por gentileza, cópia do processo."] * 3000, final)]
+        for caminho in arquivos:
+            with self.subTest(arquivo=os.path.basename(caminho)):
+                completo = carregar_dados(caminho)
+                blocos = list(carregar_dados_em_blocos(caminho, tamanho_bloco=128))
+                self.assertGreater(len(blocos), 1)
+                pd.testing.assert_frame_equal(pd.concat(blocos, ignore_index=True), completo, check_dtype=False)
+        self.assertEqual(completo['Texto Mascarado'].iloc[-1], 'Atenciosamente, João Silva')
+
+    def test_gravador_colunar_ida_e_volta(self):
+        """Parquet e Arrow: blocos gravados um a um voltam iguais, com listas por tipo de evidência."""
+        import pyarrow
+        import main
+
+        detector = DetectorDPI(usar_nlp=False)
+        # O primeiro bloco não tem evidências (listas vazias, tipo null) e não pode fixar o esquema
+        blocos = [pd.DataFrame({'ID': [1, 2], 'Texto': ["Sem dados.", "Solicito cópia."]}),
+                  pd.DataFrame({'ID': [3, 4], 'Texto': ["CPF 123.456.789-09, e-mail joao@exemplo.com",
+                                                        "Fone 61 99999-8888"]})]
+        resultados = [main.montar_resultado(bloco, [main.resumir_analise(a) for a in
+                                                    detector.analisar_lote(bloco['Texto'].tolist())],
+                                            estruturado=True) for bloco in blocos]
+        esperado = pd.concat(resultados, ignore_index=True)
+
+        for extensao in ('.parquet', '.arrow'):
+            with self.subTest(formato=extensao):
+                caminho = os.path.join(self.diretorio.name, 'resultado' + extensao)
+                gravador = GravadorColunar(caminho)
+                self.assertTrue(all(gravador.gravar(df) for df in resultados))
+                gravador.fechar()
+
+                esquema = (pyarrow.parquet.read_schema(caminho) if extensao == '.parquet'
+                           else pyarrow.ipc.open_file(caminho).schema)
+                for tipo in TIPOS_EVIDENCIA:
+                    self.assertEqual(esquema.field(f'Elementos_{tipo}').type, pyarrow.list_(pyarrow.string()))
+
+                for lido in (carregar_dados(caminho),
+                             pd.concat(carregar_dados_em_blocos(caminho, tamanho_bloco=3), ignore_index=True)):
+                    self.assertEqual(lido.columns.tolist(), esperado.columns.tolist())
+                    self.assertEqual(lido['Classificacao'].tolist(), ['PUBLICO', 'PUBLICO', 'PRIVADO', 'PRIVADO'])
+                    for tipo in TIPOS_EVIDENCIA:
+                        coluna = f'Elementos_{tipo}'
+                        self.assertEqual([list(v) for v in lido[coluna]], esperado[coluna].tolist(), coluna)
+                self.assertEqual(list(lido['Elementos_CPF'].iloc[2]), ['123.456.789-09'])
+
+    def test_gravador_colunar_coluna_esparsa_em_streaming(self):
+        """Uma coluna vazia em blocos inteiros do CSV (lida como float64) não quebra o esquema."""
+        caminho_csv = os.path.join(self.diretorio.name, 'esparsa.csv')
+        observacoes = [None] * 150 + ['nota'] * 50 + [None] * 100
+        pd.DataFrame({'ID': range(300), 'Texto Mascarado': ['Solicito cópia.'] * 300,
+                      'Obs': observacoes}).to_csv(caminho_csv, sep=';', index=False)
+
+        for extensao in ('.parquet', '.arrow'):
+            with self.subTest(formato=extensao):
+                caminho = os.path.join(self.diretorio.name, 'esparsa' + extensao)
+                gravador = GravadorColunar(caminho)
+                self.assertTrue(all(gravador.gravar(bloco)
+                                    for bloco in carregar_dados_em_blocos(caminho_csv, tamanho_bloco=50)))
+                gravador.fechar()
+
+                lido = carregar_dados(caminho)
+                self.assertEqual(lido.shape, (300, 3))
+                self.assertEqual([v if pd.notna(v) else None for v in lido['Obs']], observacoes)
+
+
+if __name__ == '__main__':
+    unittest.main()
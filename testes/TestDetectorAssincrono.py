@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+import asyncio
+
+# Adiciona o diretório raiz ao path para encontrar o módulo 'fontes'
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fontes.assincrono import DetectorDPIAssincrono
+from fontes.detectores import DetectorDPI
+
+TEXTOS = [
+    "O usuário João Silva, portador do CPF 123.456.789-09, solicitou acesso.",
+    "Solicito cópia do processo.",
+    "",
+    "Contato: joao.silva@email.com.br ou (61) 99999-8888.",
+] * 10
+
+
+async def _fluxo(textos, intervalo=0.0):
+    for texto in textos:
+        await asyncio.sleep(intervalo)
+        yield texto
+
+
+class TestDetectorDPIAssincrono(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.detector = DetectorDPI()
+        cls.esperados = [cls.detector.analisar(t) for t in TEXTOS]
+
+    def _executar(self, corrotina):
+        return asyncio.run(corrotina)
+
+    def test_analisar_e_lote_equivalem_ao_sincrono(self):
+        async def cenario():
+            async with DetectorDPIAssincrono(self.detector) as assincrono:
+                individual = await assincrono.analisar(TEXTOS[0])
+                lotes = await asyncio.gather(*(assincrono.analisar_lote(TEXTOS[i:i + 7])
+                                               for i in range(0, len(TEXTOS), 7)))
+            return individual, [r for lote in lotes for r in lote]
+
+        individual, resultados = self._executar(cenario())
+        self.assertEqual(individual, self.esperados[0])
+        self.assertEqual(resultados, self.esperados)
+
+    def test_fluxo_assincrono_entrega_todos_os_resultados(self):
+        """Fluxos lentos também são atendidos: lotes incompletos fecham após espera_max_s."""
+        async def cenario():
+            async with DetectorDPIAssincrono(self.detector, tamanho_lote=8, max_em_andamento=2,
+                                             espera_max_s=0.01) as assincrono:
+                return [item async for item in assincrono.analisar_fluxo(_fluxo(TEXTOS, 0.001))]
+
+        resultados = self._executar(cenario())
+        self.assertEqual(sorted(indice for indice, _ in resultados), list(range(len(TEXTOS))))
+        for indice, resultado in resultados:
+            self.assertEqual(resultado, self.esperados[indice])
+
+    def test_cancelamento_libera_recursos(self):
+        """Interromper o fluxo cancela a leitura e devolve as vagas do semáforo."""
+        async def cenario():
+            async with DetectorDPIAssincrono(self.detector, tamanho_lote=4, max_em_andamento=2) as assincrono:
+                fluxo = assincrono.analisar_fluxo(_fluxo(TEXTOS * 100))
+                recebidos = 0
+                async for _ in fluxo:
+                    recebidos += 1
+                    if recebidos == 5:
+                        break
+                await fluxo.aclose()
+
+                tarefa = asyncio.ensure_future(assincrono.analisar_lote(TEXTOS * 50))
+                await asyncio.sleep(0)
+                tarefa.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await tarefa
+
+                # Todas as vagas voltaram: novas análises não ficam bloqueadas
+                resultado = await asyncio.wait_for(assincrono.analisar(TEXTOS[0]), timeout=10)
+                return recebidos, resultado, assincrono._semaforo._value
+
+        recebidos, resultado, vagas = self._executar(cenario())
+        self.assertEqual(recebidos, 5)
+        self.assertEqual(resultado, self.esperados[0])
+        self.assertEqual(vagas, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
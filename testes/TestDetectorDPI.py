@@ -1,16 +1,26 @@
 import unittest
 import sys
 import os
+import tempfile
+import time
+import csv
 
 # Adiciona o diretório raiz ao path para encontrar o módulo 'fontes'
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from fontes.detectores import DetectorDPI
+from fontes import detectores
+from fontes.detectores import (DetectorDPI, carregar_modelo_spacy, CAMADAS_DETECCAO, CamadaDeteccao,
+                               registrar_camada)
+from fontes.dicionario_exclusao import DicionarioExclusao
+from fontes.utilitarios import mascarar_texto
+from fontes.estatisticas import EstatisticasDeteccao
 
 
 class TestDetectorDPI(unittest.TestCase):
-    def setUp(self):
-        self.detector = DetectorDPI()
+    @classmethod
+    def setUpClass(cls):
+        # Um detector para toda a classe; o modelo Spacy é compartilhado entre instâncias
+        cls.detector = DetectorDPI()
 
     def test_falsos_positivos_tecnicos(self):
         """Testa se o código ignora números que parecem PII mas são técnicos (usando filtro leve)."""
@@ -68,6 +78,221 @@ class TestDetectorDPI(unittest.TestCase):
         self.assertTrue(resultado['contem_dpi'])
         self.assertEqual(resultado['nivel_risco'], 'Alto')
 
+    def test_rg_endereco_e_financeiro(self):
+        """Camadas de contexto: palavra-chave seguida de número, com DV do RG quando existe."""
+        self.assertEqual(self.detector.analisar("RG 24.678.131-2")['evidencias'], {'RG': ['RG 24.678.131-2']})
+        self.assertEqual(self.detector.analisar("RG 24.678.131-2 SSP/SP.")['evidencias'],
+                         {'RG': ['RG 24.678.131-2 SSP/SP']})
+        self.assertFalse(self.detector.analisar("RG 24.678.131-1 SSP/SP")['contem_dpi'])  # DV de SP inválido
+        # Mesmo formato de outros estados (ou sem UF): o cálculo de SP não se aplica
+        self.assertEqual(self.detector.analisar("RG 24.678.131-1 SSP/RJ")['nivel_risco'], 'Alto')
+        self.assertTrue(self.detector.analisar("RG 24.678.131-1")['contem_dpi'])
+        self.assertFalse(self.detector._validar_rg_matematico("11.111.111-1"))
+        # RG do DF: sem dígito verificador, aceito pelo contexto
+        self.assertEqual(self.detector.analisar("Identidade nº 1.234.567")['nivel_risco'], 'Alto')
+
+        self.assertEqual(self.detector.analisar("Moro na Rua das Flores, 123.")['evidencias'],
+                         {'Endereco': ['Rua das Flores, 123']})
+        resultado = self.detector.analisar("Residente na SQS 308 bloco A.")
+        self.assertEqual((resultado['evidencias'], resultado['nivel_risco']), ({'Endereco': ['SQS 308']}, 'Baixo'))
+        # Endereço junto de um nome identifica a pessoa
+        self.assertEqual(self.detector.analisar("Maria Souza mora na Av. Central 45")['nivel_risco'], 'Alto')
+
+        resultado = self.detector.analisar("Depositar na Agência: 1234-5, PIX 61999998888.")
+        self.assertEqual(resultado['evidencias']['Financeiro'], ['Agência: 1234-5', 'PIX 61999998888'])
+        resultado = self.detector.analisar("Conta Corrente 12345-6, cartão 4111 1111 1111 1111.")
+        self.assertEqual(resultado['evidencias']['Financeiro'], ['Conta Corrente 12345-6', 'cartão 4111 1111 1111 1111'])
+        # Anos, códigos e cartões com dígito de Luhn inválido não são dados financeiros
+        for texto in ["Banco de dados 2023", "Qual o reajuste do salário 2024?", "Cartão 2025 do SUS",
+                      "Banco 2024", "Conta 2024", "Cartão 4111 1111 1111 1112"]:
+            resultado = self.detector.analisar(texto)
+            self.assertNotIn('Financeiro', resultado['evidencias'], texto)
+            self.assertNotEqual(resultado['nivel_risco'], 'Alto', texto)
+
+    def test_endereco_em_tempo_linear(self):
+        """Logradouros sem número não podem gerar retrocesso quadrático em textos longos."""
+        inicio = time.perf_counter()
+        self.assertNotIn('Endereco', self.detector.analisar("Rua " * 20000)['evidencias'])
+        self.assertLess(time.perf_counter() - inicio, 2.0)
+
+    def test_camadas_de_contexto_nao_regridem_documentos_longos(self):
+        """Guarda de latência: RG/Endereço/Financeiro custam no máximo 2x a varredura original."""
+        # Documento longo (~150 mil caracteres) com os pedidos reais da amostra e-SIC
+        caminho = os.path.join(os.path.dirname(__file__), '..', 'data', 'AMOSTRA_e-SIC.csv')
+        with open(caminho, encoding='iso-8859-1', newline='') as arquivo:
+            texto = " ".join(linha[-1] for linha in csv.reader(arquivo, delimiter=';')) * 3
+
+        def melhor_tempo(detector):
+            tempos = []
+            for _ in range(5):
+                inicio = time.perf_counter()
+                detector.analisar(texto)
+                tempos.append(time.perf_counter() - inicio)
+            return min(tempos)
+
+        originais = DetectorDPI(usar_nlp=False, camadas=['CPF', 'CNPJ', 'Email', 'Telefone', 'Nomes'])
+        self.assertLess(melhor_tempo(DetectorDPI(usar_nlp=False)), 2.0 * melhor_tempo(originais))
+
+    def test_camadas_ligadas_e_ordem_de_custo(self):
+        """Só as camadas escolhidas rodam; a execução segue o custo declarado (NER por último)."""
+        texto = "João Silva, CPF 123.456.789-09, e-mail joao@exemplo.com, Rua das Flores 10."
+        detector = DetectorDPI(usar_nlp=False, camadas=['Email', 'Endereco'])
+        self.assertEqual(detector.analisar(texto)['evidencias'],
+                         {'Email': ['joao@exemplo.com'], 'Endereco': ['Rua das Flores 10']})
+        self.assertIsNone(detector.nlp)  # Sem a camada de nomes o Spacy não é carregado
+        self.assertNotEqual(detector.assinatura(True), self.detector.assinatura(True))
+
+        custos = [camada.custo for camada in self.detector.camadas]
+        self.assertEqual(custos, sorted(custos))
+        self.assertEqual(self.detector.camadas[-1].tipo, 'Nomes')
+        with self.assertRaises(ValueError):
+            DetectorDPI(camadas=['CPF', 'Passaporte'])
+
+    def test_registrar_nova_camada(self):
+        registrar_camada(CamadaDeteccao('Processo', 1, r'\bSEI\s?\d{5,}\b', r'SEI'))
+        try:
+            detector = DetectorDPI(usar_nlp=False)
+            evidencias = detector.analisar("Processo SEI 00123456, CPF 123.456.789-09.")['evidencias']
+        finally:
+            del CAMADAS_DETECCAO['Processo']
+        self.assertEqual(evidencias, {'CPF': ['123.456.789-09'], 'Processo': ['SEI 00123456']})
+
+    def test_somente_veredito(self):
+        """O modo veredito para no primeiro achado decisivo e mantém o contem_dpi do modo completo."""
+        veredito = DetectorDPI(somente_veredito=True)
+        texto = "CPF 123.456.789-09, e-mail joao@exemplo.com, telefone (61) 99999-8888."
+        self.assertEqual(veredito.analisar(texto)['evidencias'], {'CPF': ['123.456.789-09']})
+
+        textos = [texto, "João Silva pediu cópia.", "Solicito cópia do processo.", "RG 24.678.131-1", ""]
+        for estrito in (True, False):
+            self.assertEqual([r['contem_dpi'] for r in veredito.analisar_lote(textos, estrito=estrito)],
+                             [r['contem_dpi'] for r in self.detector.analisar_lote(textos, estrito=estrito)])
+        if veredito.nlp is not None:
+            # Com Spacy, o texto decidido pelo CPF não passou pelo NER
+            self.assertGreater(veredito.contadores['ner_dispensado'], 0)
+
+    def test_posicoes_e_mascaramento(self):
+        """Cada ocorrência traz sua posição no texto; o mascaramento usa só essas posições."""
+        texto = "CPF 123.456.789-09 de João Silva; repito: CPF 123.456.789-09, fone 61 99999-8888."
+        resultado = DetectorDPI(usar_nlp=False).analisar(texto)
+        self.assertEqual(resultado['evidencias']['CPF'], ['123.456.789-09'])
+        segundo = texto.index('123.456.789-09', 5)
+        self.assertEqual(resultado['posicoes']['CPF'], [[4, 18], [segundo, segundo + 14]])
+        for tipo, posicoes in resultado['posicoes'].items():
+            for inicio, fim in posicoes:
+                self.assertIn(texto[inicio:fim], resultado['evidencias'][tipo])
+        self.assertEqual(mascarar_texto(texto, resultado['posicoes']),
+                         "CPF [CPF] de [Nomes]; repito: CPF [CPF], fone [Telefone].")
+        # Trechos sobrepostos viram uma única marcação
+        self.assertEqual(mascarar_texto("tel 61999998888", {'CPF': [[4, 15]], 'Telefone': [[4, 15]]}), "tel [CPF]")
+        self.assertEqual(mascarar_texto("abc", {}), "abc")
+
+    def test_analisar_lote_equivale_a_analisar(self):
+        """Garante que o modo em lote devolve o mesmo resultado, na mesma ordem, que `analisar`."""
+        textos = [
+            "O usuário João Silva, portador do CPF 123.456.789-09, solicitou acesso.",
+            "",
+            None,
+            "A empresa detentora é o CNPJ 11.222.333/0001-81.",
+            "Relatório técnico assinado por João Silva.",
+            "   ",
+            "Ligar para (61) 98888-7777 para confirmar os dados.",
+        ]
+        for estrito in (True, False):
+            esperado = [self.detector.analisar(t, estrito=estrito) for t in textos]
+            obtido = self.detector.analisar_lote(iter(textos), estrito=estrito, batch_size=2)
+            self.assertEqual(len(obtido), len(textos))
+            for e, o in zip(esperado, obtido):
+                self.assertEqual(e['contem_dpi'], o['contem_dpi'])
+                self.assertEqual(e.get('nivel_risco'), o.get('nivel_risco'))
+                self.assertEqual({k: sorted(v) for k, v in e['evidencias'].items()},
+                                 {k: sorted(v) for k, v in o['evidencias'].items()})
+
+    def test_varredura_unica_tipos_sobrepostos(self):
+        """A varredura combinada deve reportar tipos diferentes que se sobrepõem no mesmo trecho."""
+        # Celular de 11 dígitos que também é um CPF válido, e CPF dentro de um e-mail
+        texto = "Contato 61988880025 ou joao.12345678909@exemplo.com"
+        evidencias = self.detector.analisar(texto)['evidencias']
+        self.assertEqual(evidencias['CPF'], ['61988880025', '12345678909'])
+        self.assertEqual(evidencias['Telefone'], ['61988880025'])
+        self.assertEqual(evidencias['Email'], ['joao.12345678909@exemplo.com'])
+        self.assertEqual(list(evidencias), ['CPF', 'Email', 'Telefone'])
+
+    def test_pre_filtro_ner(self):
+        """O pré-filtro só deve enviar ao NER textos com sequência de palavras capitalizadas."""
+        detector = DetectorDPI(pre_filtro_ner=True)
+        self.assertFalse(detector._precisa_ner("o processo sei foi arquivado em 2023."))
+        self.assertFalse(detector._precisa_ner("Solicito cópia do processo."))
+        self.assertTrue(detector._precisa_ner("Relatório assinado por João Silva."))
+        self.assertTrue(detector._precisa_ner("Requerente: Maria da Conceição"))
+        self.assertEqual(detector.contadores, {'ner_executado': 2, 'ner_ignorado': 2, 'ner_dispensado': 0})
+
+    def test_estatisticas_por_camada(self):
+        """A instrumentação registra chamadas por camada, achados por tipo e agrega entre instâncias."""
+        detector = DetectorDPI(instrumentar=True)
+        textos = ["O usuário João Silva, portador do CPF 123.456.789-09, solicitou acesso.", "Sem dados.", ""]
+        detector.analisar_lote(textos)
+        dados = detector.estatisticas.como_dict()
+        self.assertEqual(dados['textos'], 2)
+        self.assertEqual(dados['camadas']['regex']['chamadas'], 2)
+        self.assertEqual(dados['camadas']['checksum']['chamadas'], 1)
+        self.assertEqual(dados['achados'], {'CPF': 1, 'Nomes': 1})
+
+        total = EstatisticasDeteccao()
+        total.mesclar(dados)
+        total.mesclar(detector.estatisticas)
+        self.assertEqual(total.como_dict()['camadas']['regex']['chamadas'], 4)
+        self.assertEqual(total.achados['CPF'], 2)
+        self.assertIsNone(DetectorDPI().estatisticas)
+
+
+    def test_dicionario_exclusao(self):
+        """O filtro de entidades ignora acentos/maiúsculas e só casa palavras inteiras."""
+        dicionario = DicionarioExclusao(["Gama", "Secretaria de Saúde"])
+        self.assertTrue(dicionario.contem_termo("SECRETARIA DE SAUDE do DF"))
+        self.assertTrue(dicionario.contem_termo("Hospital do Gama"))
+        self.assertFalse(dicionario.contem_termo("Gamaliel Souza"))
+        self.assertFalse(dicionario.contem_termo("Secretaria de Saúdes"))
+
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', encoding='utf-8', delete=False) as arquivo:
+            arquivo.write("# comentário\nTaguatinga\n\nDetran\n")
+        try:
+            detector = DetectorDPI(usar_nlp=False, arquivos_exclusao=[arquivo.name])
+        finally:
+            os.remove(arquivo.name)
+        self.assertTrue(detector.dicionario_exclusao.contem_termo("Região de Taguatinga"))
+        self.assertNotEqual(detector.assinatura(True), DetectorDPI(usar_nlp=False).assinatura(True))
+        self.assertTrue(self.detector.dicionario_exclusao.contem_termo("Administração Regional de Ceilândia"))
+
+    def test_lugares_que_tambem_sao_nomes(self):
+        """Regiões como "Santa Maria" e "Vicente Pires" só descartam o nome com contexto de lugar."""
+        detector = DetectorDPI(usar_nlp=False)
+
+        def nomes(texto, *nomes_candidatos):
+            # Posições como as do NER, que reconhece o nome completo
+            posicoes = [[texto.index(n), texto.index(n) + len(n)] for n in nomes_candidatos]
+            return [texto[inicio:fim] for inicio, fim in detector._extrair_nomes(texto, posicoes_heuristicas=posicoes)]
+
+        self.assertEqual(nomes("A servidora Maria Santa Maria pediu cópia.", "Maria Santa Maria"),
+                         ["Maria Santa Maria"])
+        self.assertEqual(nomes("Falei com Vicente Pires ontem.", "Vicente Pires"), ["Vicente Pires"])
+        self.assertEqual(nomes("Moro na Região Administrativa de Vicente Pires.", "Vicente Pires"), [])
+        self.assertEqual(nomes("Sou morador de Santa Maria desde 2010.", "Santa Maria"), [])
+        self.assertEqual(nomes("A obra em Santa Maria atrasou.", "Santa Maria"), [])
+        # Lugares sem ambiguidade continuam descartados em qualquer contexto
+        self.assertEqual(nomes("Falei com Lago Sul ontem.", "Lago Sul"), [])
+        self.assertIn("santa maria", detector.dicionario_exclusao.lugares_ambiguos)
+        self.assertNotIn("santa maria", detector.dicionario_exclusao.termos)
+
+
+    def test_modelo_carregado_sob_demanda_e_compartilhado(self):
+        """O Spacy só é carregado no primeiro uso, uma vez por processo e tamanho de modelo."""
+        detector = DetectorDPI()
+        self.assertIs(detector._nlp, detectores._NAO_CARREGADO)
+        self.assertIs(detector.nlp, self.detector.nlp)
+        self.assertIs(detector.nlp, carregar_modelo_spacy("sm"))
+        self.assertIsNone(DetectorDPI(usar_nlp=False).nlp)
+
 
 if __name__ == '__main__':
     print("Iniciando bateria de testes para redução de falsos positivos...")
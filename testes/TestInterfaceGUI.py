@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+# Adiciona o diretório raiz ao path para encontrar o módulo 'fontes'
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+
+import interface_gui
+from fontes.cache_resultados import CacheResultados
+from fontes.detectores import DetectorDPI
+
+TEXTOS = [
+    "O usuário João Silva, CPF 123.456.789-09, solicitou acesso.",
+    "Solicito cópia do processo.",
+    "",
+    "Contato: joao.silva@email.com.br",
+    "Solicito   cópia\n do processo.",
+] * 5
+
+
+class _DetectorContado(DetectorDPI):
+    """Detector que registra o tamanho de cada lote recebido."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lotes = []
+
+    def analisar_lote(self, textos, *args, **kwargs):
+        textos = list(textos)
+        self.lotes.append(len(textos))
+        return super().analisar_lote(textos, *args, **kwargs)
+
+
+class TestInterfaceGUI(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({'ID': range(len(TEXTOS)), 'Texto': TEXTOS})
+        self.detector = _DetectorContado(usar_nlp=False)
+        referencia = DetectorDPI(usar_nlp=False).analisar_lote(
+            interface_gui.limpar_serie(self.df['Texto']).tolist())
+        self.classificacoes = ["PRIVADO" if a['contem_dpi'] else "PUBLICO" for a in referencia]
+        self.elementos = [interface_gui.formatar_elementos_gui(a['evidencias']) for a in referencia]
+
+    def _verificar(self, resultado):
+        df_final = resultado['df_final']
+        self.assertEqual(df_final['ID'].tolist(), self.df['ID'].tolist())
+        self.assertEqual(df_final['Classificacao'].tolist(), self.classificacoes)
+        self.assertEqual(df_final['Elementos_Encontrados'].tolist(), self.elementos)
+
+    def test_blocos_equivalem_a_um_unico_lote(self):
+        """Os blocos vão inteiros ao detector e o resultado é o mesmo da análise de uma vez."""
+        with mock.patch.object(interface_gui, 'TAMANHO_BLOCO_GUI', 7), \
+                mock.patch.object(interface_gui, 'exibir_tabela') as exibir_tabela:
+            resultado = interface_gui.processar_em_blocos(self.df, 'Texto', self.detector, True, None)
+        self._verificar(resultado)
+        self.assertEqual(self.detector.lotes, [7, 7, 7, 4])
+        # Com o intervalo padrão, uma análise rápida não redesenha a tabela parcial
+        exibir_tabela.assert_not_called()
+
+    def test_tabela_parcial_so_com_linhas_analisadas(self):
+        parciais = []
+        with mock.patch.object(interface_gui, 'TAMANHO_BLOCO_GUI', 10), \
+                mock.patch.object(interface_gui, 'INTERVALO_TABELA_S', 0), \
+                mock.patch.object(interface_gui, 'exibir_tabela', lambda _, df: parciais.append(df)):
+            interface_gui.processar_em_blocos(self.df, 'Texto', self.detector, True, None)
+        self.assertEqual([len(df) for df in parciais], [10, 20, 25])
+        self.assertEqual(parciais[0]['Classificacao'].tolist(), self.classificacoes[:10])
+
+    def test_cache_de_resultados_entre_analises(self):
+        """Com o cache, só os textos inéditos chegam ao detector; a segunda análise não o usa."""
+        with tempfile.TemporaryDirectory() as diretorio:
+            cache = CacheResultados(os.path.join(diretorio, 'cache.sqlite'))
+            try:
+                with mock.patch.object(interface_gui, 'TAMANHO_BLOCO_GUI', 10):
+                    self._verificar(interface_gui.processar_em_blocos(self.df, 'Texto', self.detector, True, cache))
+                    # 3 textos distintos depois da limpeza e não vazios, todos no primeiro bloco
+                    self.assertEqual(self.detector.lotes, [3])
+                    self._verificar(interface_gui.processar_em_blocos(self.df, 'Texto', self.detector, True, cache))
+                    self.assertEqual(self.detector.lotes, [3])
+            finally:
+                cache.fechar()
+
+    def test_resultados_da_sessao(self):
+        """A chave muda com o arquivo, a coluna, a configuração e as estatísticas; a sessão guarda só os mais recentes."""
+        assinatura = self.detector.assinatura(True)
+        chave = interface_gui.chave_sessao(b'ID;Texto\n1;a\n', 'Texto', assinatura, False)
+        self.assertEqual(chave, interface_gui.chave_sessao(b'ID;Texto\n1;a\n', 'Texto', assinatura, False))
+        self.assertEqual(len({chave,
+                              interface_gui.chave_sessao(b'ID;Texto\n1;b\n', 'Texto', assinatura, False),
+                              interface_gui.chave_sessao(b'ID;Texto\n1;a\n', 'ID', assinatura, False),
+                              interface_gui.chave_sessao(b'ID;Texto\n1;a\n', 'Texto', self.detector.assinatura(False), False),
+                              interface_gui.chave_sessao(b'ID;Texto\n1;a\n', 'Texto', assinatura, True)}),
+                         5)
+
+        sessao = {}
+        for i in range(interface_gui.MAX_RESULTADOS_SESSAO + 2):
+            interface_gui.guardar_na_sessao(sessao, f'chave{i}', {'n': i})
+        self.assertEqual(list(sessao), [f'chave{i}' for i in range(2, interface_gui.MAX_RESULTADOS_SESSAO + 2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import sys
+import os
+import re
+import subprocess
+import tempfile
+
+# Adiciona o diretório raiz ao path para encontrar o módulo 'fontes'
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, RAIZ)
+
+import pandas as pd
+
+TEXTOS = [
+    "Meu CPF é 123.456.789-09.",
+    "Solicito cópia do processo.",
+    "Atenciosamente, Maria Souza.",
+    "Contato: joao.silva@email.com.br",
+]
+
+
+class TestPipeline(unittest.TestCase):
+    """Execuções completas do main.py (como na linha de comando) sobre arquivos pequenos."""
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.entrada = self._caminho('entrada.csv')
+        pd.DataFrame({'ID': range(1, len(TEXTOS) + 1), 'Texto Mascarado': TEXTOS}).to_csv(self.entrada, index=False)
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def _caminho(self, nome):
+        return os.path.join(self.diretorio.name, nome)
+
+    def _executar(self, *argumentos):
+        return subprocess.run([sys.executable, os.path.join(RAIZ, 'main.py'), *argumentos],
+                              cwd=RAIZ, capture_output=True, text=True)
+
+    def _reaproveitadas(self, *argumentos):
+        processo = self._executar(self.entrada, *argumentos)
+        self.assertEqual(processo.returncode, 0, processo.stderr)
+        return tuple(map(int, re.search(r'Base anterior: (\d+) linhas reaproveitadas, (\d+) recalculadas',
+                                        processo.stdout).groups()))
+
+    def test_base_anterior_exige_mesma_assinatura(self):
+        """Resultados de outra versão das regras ou de outras opções de análise são recalculados."""
+        base = self._caminho('base.csv')
+        processo = self._executar(self.entrada, '--saida', base)
+        self.assertEqual(processo.returncode, 0, processo.stderr)
+        self.assertIn('Assinatura_Detector', pd.read_csv(base).columns)
+
+        self.assertEqual(self._reaproveitadas('--base-anterior', base, '--saida', self._caminho('r1.csv')), (4, 0))
+        self.assertEqual(self._reaproveitadas('--base-anterior', base, '--filtro-leve',
+                                              '--saida', self._caminho('r2.csv')), (0, 4))
+        self.assertEqual(self._reaproveitadas('--base-anterior', base, '--camadas', 'CPF',
+                                              '--saida', self._caminho('r3.csv')), (0, 4))
+
+        # Regras alteradas (outra versão) ou base sem assinatura (versão antiga): tudo recalculado
+        df = pd.read_csv(base)
+        df['Assinatura_Detector'] = df['Assinatura_Detector'].str.replace(r'^[^|]+', '0.0.0', regex=True)
+        df.to_csv(self._caminho('base_antiga.csv'), index=False)
+        df.drop(columns=['Assinatura_Detector']).to_csv(self._caminho('base_sem_assinatura.csv'), index=False)
+        for nome in ('base_antiga.csv', 'base_sem_assinatura.csv'):
+            self.assertEqual(self._reaproveitadas('--base-anterior', self._caminho(nome),
+                                                  '--saida', self._caminho('r4.csv')), (0, 4))
+        pd.testing.assert_frame_equal(pd.read_csv(self._caminho('r4.csv')), pd.read_csv(base))
+
+    def test_benchmark_mede_o_pipeline(self):
+        """A etapa de pipeline do benchmark roda o main.py sobre o corpus ';' que ela mesma gera."""
+        from testes.benchmark_detector import AMOSTRA_PADRAO, gerar_corpus, medir_pipeline
+        from fontes.carregador_dados import carregar_dados
+        from fontes.utilitarios import limpar_serie
+
+        textos_base = [t for t in limpar_serie(carregar_dados(AMOSTRA_PADRAO)['Texto Mascarado']).tolist() if t]
+        corpus = gerar_corpus(textos_base, 60, 0.5, semente=42)
+        for argumentos in ([], ['--streaming', '--tamanho-bloco', '25']):
+            with self.subTest(argumentos=argumentos):
+                resultado = medir_pipeline(corpus, argumentos)
+                self.assertGreater(resultado['registros_por_segundo'], 0)
+
+    def test_varrer_arquivo_exige_entrada(self):
+        """Sem arquivo de entrada, --varrer-arquivo é erro de uso (e não abre a interface gráfica)."""
+        processo = self._executar('--varrer-arquivo')
+        self.assertEqual(processo.returncode, 2)
+        self.assertIn('--varrer-arquivo exige o arquivo de entrada', processo.stderr)
+        self.assertNotIn('Interface Gráfica', processo.stdout)
+
+        saida = self._caminho('achados.csv')
+        processo = self._executar(self.entrada, '--varrer-arquivo', '--saida', saida)
+        self.assertEqual(processo.returncode, 0, processo.stderr)
+        self.assertEqual(pd.read_csv(saida)['Tipo'].tolist(), ['CPF', 'Email'])
+
+
+if __name__ == '__main__':
+    unittest.main()
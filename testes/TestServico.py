@@ -0,0 +1,100 @@
+import unittest
+import sys
+import os
+import http.client
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Adiciona o diretório raiz ao path para encontrar o módulo 'fontes'
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fontes.detectores import DetectorDPI
+from fontes.servico import ServicoDPI, criar_servidor
+
+
+class TestServico(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.detector = DetectorDPI()
+        cls.servico = ServicoDPI(cls.detector, espera_max_s=0.02)
+        cls.servidor = criar_servidor(cls.servico, porta=0)
+        cls.url = f"http://127.0.0.1:{cls.servidor.server_address[1]}"
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+        cls.servico.parar()
+
+    def _requisitar(self, rota, corpo=None):
+        dados = json.dumps(corpo).encode('utf-8') if corpo is not None else None
+        requisicao = urllib.request.Request(self.url + rota, data=dados,
+                                            headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(requisicao, timeout=10) as resposta:
+                return resposta.status, json.loads(resposta.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def test_analisar_texto_e_lote(self):
+        """Os endpoints devolvem exatamente o resultado de `analisar`."""
+        texto = "O usuário João Silva, portador do CPF 123.456.789-09, solicitou acesso."
+        status, resultado = self._requisitar('/analisar', {'texto': texto})
+        self.assertEqual(status, 200)
+        self.assertEqual(resultado, self.detector.analisar(texto))
+
+        textos = [texto, "Solicito cópia do processo.", ""]
+        status, resultado = self._requisitar('/analisar/lote', {'textos': textos, 'estrito': False})
+        self.assertEqual(status, 200)
+        self.assertEqual(resultado['resultados'], [self.detector.analisar(t, estrito=False) for t in textos])
+
+    def test_requisicoes_concorrentes_em_micro_lotes(self):
+        """Requisições simultâneas são agrupadas sem misturar os resultados entre clientes."""
+        textos = [f"Contato {i}: fulano{i}@exemplo.com" for i in range(20)]
+        lotes_antes = self.servico.metricas()['lotes']
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            respostas = list(executor.map(lambda t: self._requisitar('/analisar', {'texto': t}), textos))
+        for texto, (status, resultado) in zip(textos, respostas):
+            self.assertEqual(status, 200)
+            self.assertEqual(resultado['evidencias']['Email'], [texto.split(': ')[1]])
+        self.assertLess(self.servico.metricas()['lotes'] - lotes_antes, len(textos))
+
+    def test_saude_metricas_e_erros(self):
+        status, saude = self._requisitar('/saude')
+        self.assertEqual((status, saude['status']), (200, 'ok'))
+        self._requisitar('/analisar', {'texto': "Sem dados."})
+        status, metricas = self._requisitar('/metricas')
+        self.assertEqual(status, 200)
+        self.assertGreaterEqual(metricas['requisicoes'], 1)
+        self.assertEqual(self._requisitar('/analisar', {'sem_texto': 1})[0], 400)
+        self.assertEqual(self._requisitar('/analisar/lote', {'textos': "não é lista"})[0], 400)
+        self.assertEqual(self._requisitar('/analisar', {'texto': {'a': 1}})[0], 400)
+        self.assertEqual(self._requisitar('/analisar', {'texto': None})[0], 400)
+        self.assertEqual(self._requisitar('/analisar/lote', {'textos': ["ok", 123]})[0], 400)
+        self.assertEqual(self._requisitar('/analisar', {'texto': "ok", 'estrito': "false"})[0], 400)
+        self.assertEqual(self._requisitar('/analisar', {'texto': "ok", 'estrito': 0})[0], 400)
+        self.assertEqual(self._requisitar('/inexistente')[0], 404)
+
+    def test_content_length_invalido(self):
+        """Content-Length não numérico ou negativo é 400, sem travar a conexão à espera do corpo."""
+        for valor in ('abc', '-1'):
+            with self.subTest(content_length=valor):
+                conexao = http.client.HTTPConnection(*self.servidor.server_address, timeout=10)
+                try:
+                    conexao.putrequest('POST', '/analisar')
+                    conexao.putheader('Content-Type', 'application/json')
+                    conexao.putheader('Content-Length', valor)
+                    conexao.endheaders()
+                    resposta = conexao.getresponse()
+                    self.assertEqual(resposta.status, 400)
+                    self.assertIn('Requisição inválida', json.loads(resposta.read())['erro'])
+                finally:
+                    conexao.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
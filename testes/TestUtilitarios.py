@@ -0,0 +1,53 @@
+import unittest
+import sys
+import os
+
+# Adiciona o diretório raiz ao path para encontrar o módulo 'fontes'
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from fontes.utilitarios import coagir_texto_serie, limpar_serie, limpar_texto
+
+VALORES = [
+    "  Texto   com\tespaços\r\ne quebras \n",
+    "Linha única",
+    "\u3000espaço\u2003unicode\u2028separador\xa0\x1c",
+    "",
+    "   ",
+    "CPF 123.456.789-09\n\nFim",
+    None,
+    np.nan,
+]
+
+
+class TestUtilitarios(unittest.TestCase):
+    def _limpeza_antiga(self, valores):
+        """Limpeza linha a linha de antes da vetorização, com ausentes vazios (e não 'nan')."""
+        return [limpar_texto(str(v)) if pd.notna(v) else "" for v in valores]
+
+    def test_limpar_serie_equivale_a_limpar_texto(self):
+        for dtype in (object, 'string'):
+            with self.subTest(dtype=dtype):
+                serie = pd.Series(VALORES, dtype=dtype)
+                self.assertEqual(limpar_serie(serie).tolist(), self._limpeza_antiga(VALORES))
+
+    def test_coagir_colunas_nao_textuais(self):
+        """Colunas numéricas viram o mesmo texto de str(); ausentes viram string vazia."""
+        casos = [
+            pd.Series([1, 22, 333]),
+            pd.Series([1.5, np.nan, 3.0]),
+            pd.Series([True, None, False], dtype=object),
+            pd.Series(['a', None, 'b'], dtype='category'),
+        ]
+        for serie in casos:
+            with self.subTest(dtype=str(serie.dtype)):
+                self.assertEqual(coagir_texto_serie(serie).tolist(),
+                                 [str(v) if pd.notna(v) else "" for v in serie.tolist()])
+                self.assertEqual(limpar_serie(serie).tolist(), self._limpeza_antiga(serie.tolist()))
+        self.assertEqual(limpar_serie(pd.Series([], dtype=object)).tolist(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Adiciona o diretório raiz ao path para encontrar o módulo 'fontes'
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fontes.detectores import DetectorDPI
+from fontes.varredura_arquivo import VarredorArquivo, CAMADAS_PADRAO_ARQUIVO
+
+LINHAS = [
+    "Solicitação registrada sem dados pessoais.",
+    "Usuário com CPF 123.456.789-09 e e-mail joao.silva@email.com.br",
+    "Empresa CNPJ 11.222.333/0001-81, telefone (61) 99999-8888",
+    "CPF inválido 111.111.111-11 e processo 00015-00012345/2023-11",
+    "",
+    "Último contato: maria@exemplo.com; CPF 123.456.789-09 de novo.",
+]
+
+
+class TestVarreduraArquivo(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.conteudo = ("\n".join(LINHAS * 50) + "\n").encode('utf-8')
+        with tempfile.NamedTemporaryFile('wb', suffix='.log', delete=False) as arquivo:
+            arquivo.write(cls.conteudo)
+        cls.caminho = arquivo.name
+
+        # Referência: o detector analisando linha a linha
+        detector = DetectorDPI(usar_nlp=False, camadas=CAMADAS_PADRAO_ARQUIVO)
+        cls.esperados = []
+        for numero, linha in enumerate(cls.conteudo.decode('utf-8').split("\n"), start=1):
+            for tipo, posicoes in detector.analisar(linha).get('posicoes', {}).items():
+                cls.esperados.extend((tipo, linha[inicio:fim], numero) for inicio, fim in posicoes)
+        cls.esperados.sort()
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.caminho)
+
+    def test_equivale_ao_detector_em_qualquer_janela(self):
+        """Achados que cruzam a fronteira entre janelas não são perdidos nem repetidos."""
+        for tamanho_janela in (16 * 2 ** 20, 1000, 97, 13):
+            with self.subTest(tamanho_janela=tamanho_janela):
+                processados = []
+                achados = list(VarredorArquivo(tamanho_janela=tamanho_janela, sobreposicao=256)
+                               .varrer(self.caminho, processados.append))
+                self.assertEqual(sorted((tipo, valor, linha) for tipo, valor, _, _, linha in achados),
+                                 self.esperados)
+                self.assertEqual(sum(processados), len(self.conteudo))
+
+    def test_posicoes_em_bytes(self):
+        achados = list(VarredorArquivo().varrer(self.caminho))
+        self.assertEqual([a[2] for a in achados], sorted(a[2] for a in achados))
+        for tipo, valor, inicio, fim, linha in achados:
+            self.assertEqual(self.conteudo[inicio:fim].decode('utf-8'), valor)
+            self.assertEqual(self.conteudo.count(b'\n', 0, inicio) + 1, linha)
+        self.assertNotIn('111.111.111-11', [a[1] for a in achados])  # Checksum também vale aqui
+
+    def test_camadas_e_arquivo_vazio(self):
+        achados = list(VarredorArquivo(['Email']).varrer(self.caminho))
+        self.assertEqual({tipo for tipo, *_ in achados}, {'Email'})
+        with self.assertRaises(ValueError):
+            VarredorArquivo(['RG'])  # Padrão não ASCII: não vale sobre bytes
+        with tempfile.NamedTemporaryFile('wb', delete=False) as vazio:
+            pass
+        try:
+            self.assertEqual(list(VarredorArquivo().varrer(vazio.name)), [])
+        finally:
+            os.remove(vazio.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
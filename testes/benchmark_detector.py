@@ -0,0 +1,247 @@
+"""
+Benchmark de desempenho do DetectorDPI (vazão, latência e memória).
+
+Gera um corpus sintético no estilo e-SIC a partir de data/AMOSTRA_e-SIC.csv, com tamanho e
+densidade de DPI configuráveis, e mede:
+  - `analisar` registro a registro (registros/s, latência p50/p99, pico de memória) e
+    `analisar_lote` (registros/s), sem Spacy e com cada modelo disponível (sm/md/lg);
+  - o pipeline completo `main.py` (tempo total e pico de memória do processo).
+
+Os resultados são gravados em JSON e podem ser comparados com uma execução de referência:
+
+    python testes/benchmark_detector.py --registros 5000 --saida benchmark.json
+    python testes/benchmark_detector.py --registros 5000 --baseline benchmark.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Adiciona o diretório raiz ao path para encontrar o módulo 'fontes'
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, RAIZ)
+
+from fontes.carregador_dados import carregar_dados
+from fontes.detectores import DetectorDPI, VERSAO_DETECTOR
+from fontes.utilitarios import limpar_serie
+
+AMOSTRA_PADRAO = os.path.join(RAIZ, 'data', 'AMOSTRA_e-SIC.csv')
+
+NOMES = ["João", "Maria", "Ana", "Pedro", "Francisco", "Antônio", "Luiza", "Carlos", "Fernanda", "José"]
+SOBRENOMES = ["Silva", "Souza", "Oliveira", "Santos", "Pereira", "Lima", "Carvalho", "Almeida", "Ribeiro", "Gomes"]
+
+# Métricas em que um valor maior é pior (as demais: maior é melhor)
+METRICAS_MAIOR_PIOR = {'latencia_p50_ms', 'latencia_p99_ms', 'pico_memoria_mb', 'tempo_total_s'}
+
+
+def _gerar_cpf(rng):
+    numeros = [rng.randint(0, 9) for _ in range(9)]
+    for i in range(9, 11):
+        soma = sum(numeros[k] * ((i + 1) - k) for k in range(i))
+        numeros.append((soma * 10 % 11) % 10)
+    n = ''.join(map(str, numeros))
+    return f"{n[:3]}.{n[3:6]}.{n[6:9]}-{n[9:]}"
+
+
+def _gerar_cnpj(rng):
+    numeros = [rng.randint(0, 9) for _ in range(8)] + [0, 0, 0, 1]
+    for pesos in ([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2], [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]):
+        resto = sum(n * p for n, p in zip(numeros, pesos)) % 11
+        numeros.append(0 if resto < 2 else 11 - resto)
+    n = ''.join(map(str, numeros))
+    return f"{n[:2]}.{n[2:5]}.{n[5:8]}/{n[8:12]}-{n[12:]}"
+
+
+def _gerar_dpi(rng):
+    nome, sobrenome = rng.choice(NOMES), rng.choice(SOBRENOMES)
+    return rng.choice([
+        lambda: f"Meu CPF é {_gerar_cpf(rng)}.",
+        lambda: f"A empresa de CNPJ {_gerar_cnpj(rng)} foi contratada.",
+        lambda: f"Responder para {nome.lower()}.{sobrenome.lower()}@email.com.br.",
+        lambda: f"Contato: (61) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}.",
+        lambda: f"Atenciosamente, {nome} {sobrenome}.",
+    ])()
+
+
+def gerar_corpus(textos_base, registros, densidade, semente):
+    """
+    Monta `registros` textos sorteados da amostra; uma fração `densidade` deles recebe
+    um ou mais trechos sintéticos com DPI (CPF/CNPJ válidos, e-mail, telefone ou nome).
+    """
+    rng = random.Random(semente)
+    corpus = []
+    for _ in range(registros):
+        texto = rng.choice(textos_base)
+        if rng.random() < densidade:
+            trechos = [_gerar_dpi(rng) for _ in range(rng.randint(1, 3))]
+            texto = ' '.join([texto] + trechos)
+        corpus.append(texto)
+    return corpus
+
+
+def _percentil(valores_ordenados, p):
+    indice = min(len(valores_ordenados) - 1, int(round(p / 100 * (len(valores_ordenados) - 1))))
+    return valores_ordenados[indice]
+
+
+def medir_detector(detector, corpus, amostra_memoria):
+    """Mede `analisar` (latência por registro), `analisar_lote` (vazão) e o pico de memória."""
+    latencias = []
+    inicio = time.perf_counter()
+    for texto in corpus:
+        t0 = time.perf_counter_ns()
+        detector.analisar(texto)
+        latencias.append(time.perf_counter_ns() - t0)
+    tempo_individual = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    detector.analisar_lote(corpus)
+    tempo_lote = time.perf_counter() - inicio
+
+    # Medido à parte: o tracemalloc distorce os tempos
+    tracemalloc.start()
+    detector.analisar_lote(corpus[:amostra_memoria])
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencias.sort()
+    return {
+        'registros_por_segundo': len(corpus) / tempo_individual,
+        'registros_por_segundo_lote': len(corpus) / tempo_lote,
+        'latencia_p50_ms': _percentil(latencias, 50) / 1e6,
+        'latencia_p99_ms': _percentil(latencias, 99) / 1e6,
+        'pico_memoria_mb': pico / 2 ** 20,
+    }
+
+
+def medir_pipeline(corpus, argumentos_extra):
+    """Executa o main.py como subprocesso sobre o corpus e mede tempo total e pico de memória (RSS)."""
+    with tempfile.TemporaryDirectory() as diretorio:
+        entrada = os.path.join(diretorio, 'corpus.csv')
+        saida = os.path.join(diretorio, 'resultado.csv')
+        with open(entrada, 'w', encoding='utf-8', newline='') as arquivo:
+            arquivo.write('ID;Texto Mascarado\n')
+            for i, texto in enumerate(corpus, 1):
+                arquivo.write(f'{i};"{texto.replace(chr(34), chr(34) * 2)}"\n')
+
+        inicio = time.perf_counter()
+        processo = subprocess.run(
+            [sys.executable, os.path.join(RAIZ, 'main.py'), entrada, '--saida', saida] + argumentos_extra,
+            cwd=RAIZ, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        tempo_total = time.perf_counter() - inicio
+
+    if processo.returncode != 0:
+        raise RuntimeError(f"main.py falhou: {processo.stderr.strip()[-500:]}")
+
+    resultado = {'tempo_total_s': tempo_total, 'registros_por_segundo': len(corpus) / tempo_total}
+    try:
+        import resource
+        # ru_maxrss em KB no Linux (bytes no macOS)
+        fator = 1 if sys.platform == 'darwin' else 1024
+        resultado['pico_memoria_mb'] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * fator / 2 ** 20
+    except ImportError:
+        pass
+    return resultado
+
+
+def comparar(atual, referencia, tolerancia):
+    """Lista as métricas que pioraram mais que `tolerancia` (fração) em relação à referência."""
+    regressoes = []
+    for cenario, metricas in atual['resultados'].items():
+        base = referencia.get('resultados', {}).get(cenario)
+        if not base:
+            continue
+        for metrica, valor in metricas.items():
+            valor_base = base.get(metrica)
+            if not isinstance(valor, (int, float)) or not isinstance(valor_base, (int, float)) or not valor_base:
+                continue
+            variacao = (valor - valor_base) / valor_base
+            piorou = variacao > tolerancia if metrica in METRICAS_MAIOR_PIOR else variacao < -tolerancia
+            print(f"  {cenario:<22} {metrica:<28} {valor_base:>12.3f} -> {valor:>12.3f} ({variacao:+.1%})"
+                  f"{'  <-- REGRESSÃO' if piorou else ''}")
+            if piorou:
+                regressoes.append((cenario, metrica))
+    return regressoes
+
+
+def principal():
+    parser = argparse.ArgumentParser(description='Benchmark de desempenho do DetectorDPI')
+    parser.add_argument('--amostra', default=AMOSTRA_PADRAO, help='CSV usado como base do corpus sintético')
+    parser.add_argument('--registros', type=int, default=2000, help='Quantidade de registros do corpus')
+    parser.add_argument('--densidade', type=float, default=0.3, help='Fração de registros com DPI sintético (0 a 1)')
+    parser.add_argument('--semente', type=int, default=42, help='Semente do gerador do corpus')
+    parser.add_argument('--modelos', nargs='*', default=['sm', 'md', 'lg'], help='Modelos Spacy a medir')
+    parser.add_argument('--sem-pipeline', action='store_true', help='Não mede o pipeline completo (main.py)')
+    parser.add_argument('--amostra-memoria', type=int, default=500, help='Registros usados na medição de memória')
+    parser.add_argument('--saida', default='benchmark_resultados.json', help='Arquivo JSON de saída')
+    parser.add_argument('--baseline', help='JSON de uma execução anterior para comparação')
+    parser.add_argument('--tolerancia', type=float, default=0.10, help='Piora relativa aceita antes de acusar regressão')
+    argumentos = parser.parse_args()
+
+    df = carregar_dados(argumentos.amostra)
+    if df is None:
+        sys.exit(1)
+    coluna = next((c for c in ['Texto Mascarado', 'Texto', 'texto', 'TEXTO'] if c in df.columns), df.columns[-1])
+    textos_base = [t for t in limpar_serie(df[coluna]).tolist() if t]
+    corpus = gerar_corpus(textos_base, argumentos.registros, argumentos.densidade, argumentos.semente)
+
+    relatorio = {
+        'ambiente': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'versao_detector': VERSAO_DETECTOR,
+            'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'parametros': {
+            'registros': argumentos.registros,
+            'densidade': argumentos.densidade,
+            'semente': argumentos.semente,
+        },
+        'resultados': {},
+    }
+
+    cenarios = [('sem_spacy', DetectorDPI(usar_nlp=False))]
+    for tamanho in argumentos.modelos:
+        detector = DetectorDPI(tamanho_modelo=tamanho)
+        if detector.nlp is None:
+            print(f"Modelo pt_core_news_{tamanho} indisponível; cenário ignorado.")
+            continue
+        cenarios.append((f'spacy_{tamanho}', detector))
+
+    for nome, detector in cenarios:
+        print(f"Medindo {nome}...")
+        relatorio['resultados'][nome] = medir_detector(detector, corpus, argumentos.amostra_memoria)
+
+    if not argumentos.sem_pipeline:
+        print("Medindo pipeline completo (main.py)...")
+        relatorio['resultados']['pipeline_main'] = medir_pipeline(corpus, [])
+
+    for nome, metricas in relatorio['resultados'].items():
+        print(f"{nome}: " + ', '.join(f"{k}={v:.3f}" for k, v in metricas.items()))
+
+    with open(argumentos.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+    print(f"Resultados salvos em: {argumentos.saida}")
+
+    if argumentos.baseline:
+        with open(argumentos.baseline, encoding='utf-8') as arquivo:
+            referencia = json.load(arquivo)
+        if referencia.get('parametros') != relatorio['parametros']:
+            print(f"Aviso: parâmetros diferentes da referência ({referencia.get('parametros')}).")
+        print(f"\n--- Comparação com {argumentos.baseline} (tolerância {argumentos.tolerancia:.0%}) ---")
+        regressoes = comparar(relatorio, referencia, argumentos.tolerancia)
+        if regressoes:
+            print(f"\n{len(regressoes)} regressão(ões) de desempenho encontrada(s).")
+            sys.exit(1)
+        print("\nNenhuma regressão de desempenho.")
+
+
+if __name__ == '__main__':
+    principal()